@@ -0,0 +1,16 @@
+"""
+环境变量加载 - 整个进程只解析一次 .env 文件
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def ensure_env() -> None:
+    """
+    加载 .env 中的环境变量
+    
+    load_dotenv 会逐级向上查找并解析 .env 文件，这里只在首次调用时执行，
+    已存在的环境变量不会被覆盖
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
@@ -0,0 +1,113 @@
+"""
+LLM响应缓存 - 相同模型参数和提示词在有效期内直接复用上次的回复
+
+所有Agent使用 temperature=0，同一品种短时间内重复分析时提示词完全相同的调用
+(如首轮工具调用决策、输入相同的汇总) 无需再次请求 DeepSeek
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Optional
+
+import orjson
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration
+
+# 缓存数据库路径及有效期 (行情变化较快，只在一小时内复用)
+LLM_CACHE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports", ".llm_cache.db")
+LLM_CACHE_TTL = 3600  # 秒
+
+# 环境变量 LLM_CACHE 设为 0/false/off 时不使用缓存
+LLM_CACHE_ENV = "LLM_CACHE"
+
+# 为 True 时跳过缓存查找但仍写入新回复，随上下文传递到工作流的各个异步任务
+_refresh: ContextVar[bool] = ContextVar("llm_cache_refresh", default=False)
+
+
+class TTLSQLiteCache(BaseCache):
+    """
+    带有效期的 SQLite LLM 缓存
+
+    以 sha256(模型参数 + 提示词) 为键保存回复消息，过期条目在查询时视为未命中并被覆盖。
+    hits / misses 记录本进程内的命中情况
+    """
+
+    def __init__(self, database_path: str = LLM_CACHE_DB, ttl: float = LLM_CACHE_TTL):
+        os.makedirs(os.path.dirname(database_path), exist_ok=True)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, created REAL, response BLOB)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """查找未过期的缓存回复，处于 refresh_llm_cache 上下文时总是未命中"""
+        if _refresh.get():
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, response FROM llm_cache WHERE key = ?", (self._key(prompt, llm_string),)
+            ).fetchone()
+            if row is None or row[0] + self.ttl < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [ChatGeneration(message=message) for message in messages_from_dict(orjson.loads(row[1]))]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """保存回复，只缓存对话模型的消息结果"""
+        if not all(isinstance(generation, ChatGeneration) for generation in return_val):
+            return
+        response = orjson.dumps([message_to_dict(generation.message) for generation in return_val])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, created, response) VALUES (?, ?, ?)",
+                (self._key(prompt, llm_string), time.time(), response),
+            )
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> TTLSQLiteCache:
+    """获取进程内共享的LLM缓存实例"""
+    return TTLSQLiteCache()
+
+
+def llm_cache_enabled() -> bool:
+    """是否启用LLM缓存 (由环境变量 LLM_CACHE 控制，默认启用)"""
+    return os.getenv(LLM_CACHE_ENV, "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+@contextmanager
+def refresh_llm_cache(enabled: bool = True):
+    """
+    在上下文内忽略已缓存的回复，重新请求模型并用新回复覆盖缓存
+
+    参数:
+        enabled: 为 False 时不做任何改变，便于按参数决定是否刷新
+    """
+    token = _refresh.set(enabled)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
@@ -0,0 +1,92 @@
+"""
+默认模型与Agent缓存 - 所有Agent共享的ChatDeepSeek实例 (每个事件循环一个) 及编译后的Agent
+"""
+import asyncio
+from functools import lru_cache, wraps
+from typing import Dict
+from langchain_deepseek import ChatDeepSeek
+import os
+
+from ._env import ensure_env
+from ._llm_cache import get_llm_cache, llm_cache_enabled
+
+# 每个工厂函数最多缓存的模型实例数
+_AGENT_CACHE_SIZE = 4
+
+
+# 每个事件循环各自的模型实例 (异步HTTP连接池绑定创建时的事件循环，不能跨 asyncio.run 复用)
+_loop_models: "Dict[asyncio.AbstractEventLoop, ChatDeepSeek]" = {}
+
+
+def _create_model() -> ChatDeepSeek:
+    """创建ChatDeepSeek实例，一小时内复用提示词相同的回复 (环境变量 LLM_CACHE=0 时关闭)"""
+    ensure_env()
+    return ChatDeepSeek(
+        model="deepseek-chat",
+        temperature=0,
+        api_key=os.getenv("DEEPSEEK_API_KEY"),
+        cache=get_llm_cache() if llm_cache_enabled() else None
+    )
+
+
+@lru_cache(maxsize=1)
+def _sync_model() -> ChatDeepSeek:
+    """事件循环之外 (同步调用) 共享的模型实例"""
+    return _create_model()
+
+
+def get_default_model() -> ChatDeepSeek:
+    """
+    获取默认的ChatDeepSeek模型实例
+
+    同一事件循环内复用同一实例，使并行执行的Agent共享底层HTTP连接池；
+    每次 asyncio.run 使用新的实例，已关闭事件循环的实例随之释放。
+    在事件循环之外调用时返回进程内共享的实例
+
+    返回:
+        ChatDeepSeek模型实例
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _sync_model()
+
+    model = _loop_models.get(loop)
+    if model is None:
+        for closed in [other for other in _loop_models if other.is_closed()]:
+            del _loop_models[closed]
+        model = _loop_models[loop] = _create_model()
+    return model
+
+
+def cached_by_model(factory):
+    """
+    按模型实例缓存Agent工厂函数的返回值
+
+    create_react_agent 每次都会重新编译状态图，而提示词和工具列表是固定的，
+    因此同一个模型实例只需构建一次。ChatDeepSeek 不可哈希，这里以对象身份作为键，
+    并保存模型引用以防 id 被复用。
+
+    参数:
+        factory: 接收 model 参数的Agent工厂函数
+
+    返回:
+        带缓存的工厂函数，model 为 None 时使用默认模型
+    """
+    cache = {}
+
+    @wraps(factory)
+    def wrapper(model: ChatDeepSeek = None):
+        if model is None:
+            model = get_default_model()
+
+        entry = cache.get(id(model))
+        if entry is None or entry[0] is not model:
+            if len(cache) >= _AGENT_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            entry = (model, factory(model))
+            cache[id(model)] = entry
+        return entry[1]
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
@@ -1,33 +1,16 @@
 """
 看跌分析师 Agent - 专注于挖掘看空因素和风险警示
 """
+from typing import Final
+
 from langgraph.prebuilt import create_react_agent
 from langchain_deepseek import ChatDeepSeek
-import os
 
+from tools import save_bearish_to_markdown, web_search
+from ._model import cached_by_model
 
-def create_bearish_agent(model: ChatDeepSeek = None):
-    """
-    创建看跌分析师 Agent
-    
-    专注于从新闻、情绪和技术面中寻找看跌逻辑和做空机会
-    
-    参数:
-        model: ChatDeepSeek模型实例，如果为None则创建新实例
-    
-    返回:
-        配置好的React Agent
-    """
-    if model is None:
-        model = ChatDeepSeek(
-            model="deepseek-chat",
-            temperature=0,
-            api_key=os.getenv("DEEPSEEK_API_KEY")
-        )
-    
-    from tools import save_bearish_to_markdown, web_search
-    
-    bearish_system_prompt = """你是一位专业的看跌分析师（Bear Analyst），你的任务是从给定的市场分析材料中挖掘最有力的看空逻辑和做空机会。
+
+_BEARISH_SYSTEM_PROMPT: Final[str] = """你是一位专业的看跌分析师（Bear Analyst），你的任务是从给定的市场分析材料中挖掘最有力的看空逻辑和做空机会。
 
 ## 核心职责
 1. **深度挖掘利空因素**：从新闻、情绪、技术面中找出所有支撑价格下跌的逻辑
@@ -151,10 +134,25 @@ def create_bearish_agent(model: ChatDeepSeek = None):
 
 请基于提供的分析报告，给出最专业的看跌分析。"""
 
+
+@cached_by_model
+def create_bearish_agent(model: ChatDeepSeek = None):
+    """
+    创建看跌分析师 Agent
+    
+    专注于从新闻、情绪和技术面中寻找看跌逻辑和做空机会
+    
+    参数:
+        model: ChatDeepSeek模型实例，如果为None则使用共享的默认实例
+              同一模型实例重复调用时返回已编译的Agent
+    
+    返回:
+        配置好的React Agent
+    """
     agent = create_react_agent(
         model=model,
         tools=[save_bearish_to_markdown, web_search],
-        prompt=bearish_system_prompt
+        prompt=_BEARISH_SYSTEM_PROMPT
     )
     
     return agent
@@ -162,8 +160,8 @@ def create_bearish_agent(model: ChatDeepSeek = None):
 
 if __name__ == "__main__":
     # 测试
-    from dotenv import load_dotenv
-    load_dotenv()
+    from agents._env import ensure_env
+    ensure_env()
     
     agent = create_bearish_agent()
     
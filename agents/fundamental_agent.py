@@ -1,31 +1,16 @@
 """
 基本面分析Agent - 负责分析期货品种的技术面和基本面数据
 """
+from typing import Final
+
 from langgraph.prebuilt import create_react_agent
 from langchain_deepseek import ChatDeepSeek
-import os
 
+from tools import analyze_futures_data, save_fundamental_to_markdown
+from ._model import cached_by_model
 
-def create_fundamental_agent(model: ChatDeepSeek = None):
-    """
-    创建基本面分析Agent
-    
-    参数:
-        model: ChatDeepSeek模型实例，如果为None则创建新实例
-    
-    返回:
-        配置好的React Agent
-    """
-    if model is None:
-        model = ChatDeepSeek(
-            model="deepseek-chat",
-            temperature=0,
-            api_key=os.getenv("DEEPSEEK_API_KEY")
-        )
-    
-    from tools import analyze_futures_data, save_fundamental_to_markdown
-    
-    fundamental_system_prompt = """你是一个专业的期货基本面和技术面分析师，负责分析期货品种的数据指标。
+
+_FUNDAMENTAL_SYSTEM_PROMPT: Final[str] = """你是一个专业的期货基本面和技术面分析师，负责分析期货品种的数据指标。
 
 ## 任务流程
 1. 使用 analyze_futures_data 工具获取期货品种的技术数据
@@ -118,10 +103,23 @@ def create_fundamental_agent(model: ChatDeepSeek = None):
 
 请使用 analyze_futures_data 工具获取数据并进行分析。"""
 
+
+@cached_by_model
+def create_fundamental_agent(model: ChatDeepSeek = None):
+    """
+    创建基本面分析Agent
+    
+    参数:
+        model: ChatDeepSeek模型实例，如果为None则使用共享的默认实例
+              同一模型实例重复调用时返回已编译的Agent
+    
+    返回:
+        配置好的React Agent
+    """
     agent = create_react_agent(
         model=model,
         tools=[analyze_futures_data, save_fundamental_to_markdown],
-        prompt=fundamental_system_prompt
+        prompt=_FUNDAMENTAL_SYSTEM_PROMPT
     )
     
     return agent
@@ -129,8 +127,8 @@ def create_fundamental_agent(model: ChatDeepSeek = None):
 
 if __name__ == "__main__":
     # 测试
-    from dotenv import load_dotenv
-    load_dotenv()
+    from agents._env import ensure_env
+    ensure_env()
     
     agent = create_fundamental_agent()
     result = agent.invoke({
@@ -1,34 +1,19 @@
 """
 新闻搜集Agent - 负责搜集和整理期货相关新闻
 """
+from typing import Final
+
 from langgraph.prebuilt import create_react_agent
 from langchain_deepseek import ChatDeepSeek
-import os
 
+from tools import web_search, web_search_batch, save_news_to_markdown
+from ._model import cached_by_model
 
-def create_news_agent(model: ChatDeepSeek = None):
-    """
-    创建新闻搜集Agent
-    
-    参数:
-        model: ChatDeepSeek模型实例，如果为None则创建新实例
-    
-    返回:
-        配置好的React Agent
-    """
-    if model is None:
-        model = ChatDeepSeek(
-            model="deepseek-chat",
-            temperature=0,
-            api_key=os.getenv("DEEPSEEK_API_KEY")
-        )
-    
-    from tools import web_search, save_news_to_markdown
-    
-    news_system_prompt = """你是一个专业的期货新闻分析师，负责搜集和整理期货相关新闻资讯。
+
+_NEWS_SYSTEM_PROMPT: Final[str] = """你是一个专业的期货新闻分析师，负责搜集和整理期货相关新闻资讯。
 
 ## 任务流程
-1. 使用 web_search 工具搜索相关新闻（搜索关键词应包含"期货"和具体品种名称）
+1. 使用 web_search 工具搜索相关新闻（搜索关键词应包含"期货"和具体品种名称），需要同时搜索多个关键词时使用 web_search_batch 一次完成
 2. 整理新闻内容，分类为正向新闻（利好）和负向新闻（利空）
 3. 每个新闻总结为一段，包含：标题、来源、核心内容、对期货价格的影响分析
 4. 使用 save_news_to_markdown 工具保存报告
@@ -74,10 +59,23 @@ def create_news_agent(model: ChatDeepSeek = None):
 
 现在请开始执行新闻搜集任务。"""
 
+
+@cached_by_model
+def create_news_agent(model: ChatDeepSeek = None):
+    """
+    创建新闻搜集Agent
+    
+    参数:
+        model: ChatDeepSeek模型实例，如果为None则使用共享的默认实例
+              同一模型实例重复调用时返回已编译的Agent
+    
+    返回:
+        配置好的React Agent
+    """
     agent = create_react_agent(
         model=model,
-        tools=[web_search, save_news_to_markdown],
-        prompt=news_system_prompt
+        tools=[web_search, web_search_batch, save_news_to_markdown],
+        prompt=_NEWS_SYSTEM_PROMPT
     )
     
     return agent
@@ -85,8 +83,8 @@ def create_news_agent(model: ChatDeepSeek = None):
 
 if __name__ == "__main__":
     # 测试
-    from dotenv import load_dotenv
-    load_dotenv()
+    from agents._env import ensure_env
+    ensure_env()
     
     agent = create_news_agent()
     result = agent.invoke({
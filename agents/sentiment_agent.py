@@ -1,34 +1,19 @@
 """
 情绪分析Agent - 负责分析期货市场情绪
 """
+from typing import Final
+
 from langgraph.prebuilt import create_react_agent
 from langchain_deepseek import ChatDeepSeek
-import os
 
+from tools import save_sentiment_to_markdown, web_search, web_search_batch
+from ._model import cached_by_model
 
-def create_sentiment_agent(model: ChatDeepSeek = None):
-    """
-    创建市场情绪分析Agent
-    
-    参数:
-        model: ChatDeepSeek模型实例，如果为None则创建新实例
-    
-    返回:
-        配置好的React Agent
-    """
-    if model is None:
-        model = ChatDeepSeek(
-            model="deepseek-chat",
-            temperature=0,
-            api_key=os.getenv("DEEPSEEK_API_KEY")
-        )
-    
-    from tools import save_sentiment_to_markdown, web_search
-    
-    sentiment_system_prompt = """你是一个专业的期货市场情绪分析师，负责分析期货市场的整体情绪。
+
+_SENTIMENT_SYSTEM_PROMPT: Final[str] = """你是一个专业的期货市场情绪分析师，负责分析期货市场的整体情绪。
 
 ## 任务流程
-1. 使用 web_search 工具搜索相关情绪信息
+1. 使用 web_search 工具搜索相关情绪信息，需要同时搜索多个关键词时使用 web_search_batch 一次完成
 2. 分析市场情绪
 3. 判断情绪倾向：强烈看涨 / 看涨 / 中性偏涨 / 中性 / 中性偏跌 / 看跌 / 强烈看跌
 4. 分析情绪来源，区分正向情绪和负向情绪
@@ -87,10 +72,23 @@ def create_sentiment_agent(model: ChatDeepSeek = None):
 
 请基于提供的数据进行情绪分析。"""
 
+
+@cached_by_model
+def create_sentiment_agent(model: ChatDeepSeek = None):
+    """
+    创建市场情绪分析Agent
+    
+    参数:
+        model: ChatDeepSeek模型实例，如果为None则使用共享的默认实例
+              同一模型实例重复调用时返回已编译的Agent
+    
+    返回:
+        配置好的React Agent
+    """
     agent = create_react_agent(
         model=model,
-        tools=[save_sentiment_to_markdown, web_search],
-        prompt=sentiment_system_prompt
+        tools=[save_sentiment_to_markdown, web_search, web_search_batch],
+        prompt=_SENTIMENT_SYSTEM_PROMPT
     )
     
     return agent
@@ -98,8 +96,8 @@ def create_sentiment_agent(model: ChatDeepSeek = None):
 
 if __name__ == "__main__":
     # 测试
-    from dotenv import load_dotenv
-    load_dotenv()
+    from agents._env import ensure_env
+    ensure_env()
     
     agent = create_sentiment_agent()
     result = agent.invoke({
@@ -1,31 +1,16 @@
 """
 汇总报告Agent - 负责整合三个子Agent的分析结果，生成最终报告
 """
+from typing import Final
+
 from langgraph.prebuilt import create_react_agent
 from langchain_deepseek import ChatDeepSeek
-import os
 
+from tools import save_summary_to_markdown
+from ._model import cached_by_model
 
-def create_summary_agent(model: ChatDeepSeek = None):
-    """
-    创建汇总报告Agent
-    
-    参数:
-        model: ChatDeepSeek模型实例，如果为None则创建新实例
-    
-    返回:
-        配置好的React Agent
-    """
-    if model is None:
-        model = ChatDeepSeek(
-            model="deepseek-chat",
-            temperature=0,
-            api_key=os.getenv("DEEPSEEK_API_KEY")
-        )
-    
-    from tools import save_summary_to_markdown
-    
-    summary_system_prompt = """你是一个资深的期货投资顾问，负责整合新闻分析、情绪分析和技术分析的结果，生成最终的综合投资报告。
+
+_SUMMARY_SYSTEM_PROMPT: Final[str] = """你是一个资深的期货投资顾问，负责整合新闻分析、情绪分析和技术分析的结果，生成最终的综合投资报告。
 
 ## 任务流程
 1. 仔细阅读新闻分析报告、情绪分析报告和基本面技术分析报告
@@ -188,10 +173,23 @@ def create_summary_agent(model: ChatDeepSeek = None):
 
 请整合提供的分析报告，生成专业的综合投资报告。"""
 
+
+@cached_by_model
+def create_summary_agent(model: ChatDeepSeek = None):
+    """
+    创建汇总报告Agent
+    
+    参数:
+        model: ChatDeepSeek模型实例，如果为None则使用共享的默认实例
+              同一模型实例重复调用时返回已编译的Agent
+    
+    返回:
+        配置好的React Agent
+    """
     agent = create_react_agent(
         model=model,
         tools=[save_summary_to_markdown],
-        prompt=summary_system_prompt
+        prompt=_SUMMARY_SYSTEM_PROMPT
     )
     
     return agent
@@ -199,8 +197,8 @@ def create_summary_agent(model: ChatDeepSeek = None):
 
 if __name__ == "__main__":
     # 测试
-    from dotenv import load_dotenv
-    load_dotenv()
+    from agents._env import ensure_env
+    ensure_env()
     
     agent = create_summary_agent()
     
@@ -5,14 +5,11 @@
 这个脚本演示了工作流的结构和各个Agent的功能，
 不需要实际的API密钥即可运行（使用模拟数据）。
 """
-import sys
-import os
-
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(__file__))
-
 from tools.futures_analyzer import FuturesAnalyzer
 
+# 最近行情展示的列
+RECENT_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+
 
 def demo_futures_analyzer():
     """演示期货数据分析"""
@@ -37,7 +34,10 @@ def demo_futures_analyzer():
     
     print(f"\n最近5日数据:")
     data = analyzer.get_recent_30_days()
-    print(data.tail(5)[['date', 'open', 'high', 'low', 'close', 'volume']].to_string(index=False))
+    print(f"{'date':<10} {'open':>10} {'high':>10} {'low':>10} {'close':>10} {'volume':>10}")
+    for row in data.tail(5)[list(RECENT_COLUMNS)].itertuples(index=False):
+        print(f"{row.date:%Y-%m-%d} {row.open:>10.2f} {row.high:>10.2f} "
+              f"{row.low:>10.2f} {row.close:>10.2f} {row.volume:>10}")
     
     print("\n" + "=" * 70)
 
@@ -0,0 +1,13 @@
+"""
+pytest 公共夹具
+"""
+import pytest
+
+
+@pytest.fixture(scope="session")
+def model():
+    """整个测试会话共享的模型实例"""
+    from agents._env import ensure_env
+    from agents._model import get_default_model
+    ensure_env()
+    return get_default_model()
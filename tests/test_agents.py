@@ -1,12 +1,10 @@
 """
 Agents 测试脚本
 """
-import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from dotenv import load_dotenv
-load_dotenv()
+from agents._env import ensure_env
+ensure_env()
 
 from langchain_deepseek import ChatDeepSeek
 from agents import create_news_agent, create_sentiment_agent, create_fundamental_agent, create_summary_agent
@@ -21,22 +19,30 @@ def get_model():
     )
 
 
-def test_news_agent():
+def run_agent(agent, user_input: str) -> list:
+    """流式执行Agent，边执行边打印进度，返回产生的消息列表"""
+    messages = []
+    for chunk in agent.stream({"messages": [("user", user_input)]}, stream_mode="updates"):
+        for node, update in chunk.items():
+            new_messages = (update or {}).get("messages", [])
+            print(f"  [{node}] +{len(new_messages)} 条消息")
+            messages.extend(new_messages)
+    return messages
+
+
+def test_news_agent(model):
     """测试新闻搜集Agent"""
     print("=" * 60)
     print("测试新闻搜集Agent")
     print("=" * 60)
     
     try:
-        model = get_model()
         agent = create_news_agent(model)
         
-        result = agent.invoke({
-            "messages": [("user", "搜索不锈钢期货的最新新闻")]
-        })
+        messages = run_agent(agent, "搜索不锈钢期货的最新新闻")
         
         print("Agent响应:")
-        for msg in result["messages"][-3:]:  # 只显示最后3条
+        for msg in messages[-3:]:  # 只显示最后3条
             if hasattr(msg, 'content') and msg.content:
                 print(f"  {msg.content[:200]}...")
         
@@ -49,22 +55,19 @@ def test_news_agent():
     print("=" * 60)
 
 
-def test_sentiment_agent():
+def test_sentiment_agent(model):
     """测试情绪分析Agent"""
     print("\n" + "=" * 60)
     print("测试情绪分析Agent")
     print("=" * 60)
     
     try:
-        model = get_model()
         agent = create_sentiment_agent(model)
         
-        result = agent.invoke({
-            "messages": [("user", "分析不锈钢期货的市场情绪")]
-        })
+        messages = run_agent(agent, "分析不锈钢期货的市场情绪")
         
         print("Agent响应:")
-        for msg in result["messages"][-3:]:
+        for msg in messages[-3:]:
             if hasattr(msg, 'content') and msg.content:
                 print(f"  {msg.content[:200]}...")
         
@@ -77,22 +80,19 @@ def test_sentiment_agent():
     print("=" * 60)
 
 
-def test_fundamental_agent():
+def test_fundamental_agent(model):
     """测试基本面分析Agent"""
     print("\n" + "=" * 60)
     print("测试基本面分析Agent")
     print("=" * 60)
     
     try:
-        model = get_model()
         agent = create_fundamental_agent(model)
         
-        result = agent.invoke({
-            "messages": [("user", "分析不锈钢(ss)期货的技术面数据")]
-        })
+        messages = run_agent(agent, "分析不锈钢(ss)期货的技术面数据")
         
         print("Agent响应:")
-        for msg in result["messages"][-3:]:
+        for msg in messages[-3:]:
             if hasattr(msg, 'content') and msg.content:
                 print(f"  {msg.content[:200]}...")
         
@@ -105,14 +105,13 @@ def test_fundamental_agent():
     print("=" * 60)
 
 
-def test_summary_agent():
+def test_summary_agent(model):
     """测试汇总报告Agent"""
     print("\n" + "=" * 60)
     print("测试汇总报告Agent")
     print("=" * 60)
     
     try:
-        model = get_model()
         agent = create_summary_agent(model)
         
         # 模拟输入
@@ -129,12 +128,10 @@ def test_summary_agent():
 不锈钢期货技术面呈现多头排列，RSI在55中性区域，MACD金叉，价格站上MA20。
 """
         
-        result = agent.invoke({
-            "messages": [("user", test_input)]
-        })
+        messages = run_agent(agent, test_input)
         
         print("Agent响应:")
-        for msg in result["messages"][-3:]:
+        for msg in messages[-3:]:
             if hasattr(msg, 'content') and msg.content:
                 print(f"  {msg.content[:200]}...")
         
@@ -147,14 +144,32 @@ def test_summary_agent():
     print("=" * 60)
 
 
+def test_agent_factory_cache(model):
+    """测试Agent工厂按模型实例缓存（不调用API）"""
+    print("\n" + "=" * 60)
+    print("测试Agent工厂缓存")
+    print("=" * 60)
+
+    agent = create_news_agent(model)
+
+    # 同一模型实例返回同一个已编译的Agent
+    assert create_news_agent(model) is agent
+    # 不同模型实例重新构建
+    assert create_news_agent(get_model()) is not agent
+
+    print("测试通过!")
+    print("=" * 60)
+
+
 if __name__ == "__main__":
     print("开始测试 Agents...")
     print("注意: 测试需要配置 DEEPSEEK_API_KEY 环境变量\n")
     
-    # 测试各个Agent
-    test_news_agent()
-    test_sentiment_agent()
-    test_fundamental_agent()
-    test_summary_agent()
+    # 测试各个Agent，共享同一模型实例
+    model = get_model()
+    test_news_agent(model)
+    test_sentiment_agent(model)
+    test_fundamental_agent(model)
+    test_summary_agent(model)
     
     print("\n所有测试完成!")
@@ -1,10 +1,12 @@
 """
 FuturesAnalyzer 测试脚本
 """
-import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from datetime import date
 
+import orjson
+
+import tools.futures_analyzer as futures_analyzer
 from tools.futures_analyzer import FuturesAnalyzer, analyze_futures_data
 
 
@@ -74,6 +76,51 @@ def test_analyze_futures_data():
     print("\n" + "=" * 60)
 
 
+def test_corrupt_data_cache(tmp_path, monkeypatch):
+    """测试损坏的磁盘缓存文件会被重新获取并覆盖"""
+    print("\n" + "=" * 60)
+    print("测试损坏的磁盘缓存文件")
+    print("=" * 60)
+    
+    fetches = []
+    
+    class _FakeAnalyzer:
+        """不请求接口的分析器，记录获取次数"""
+        def __init__(self, symbol):
+            self.symbol = symbol
+        
+        def get_key_indicators(self):
+            fetches.append(self.symbol)
+            return {"最新价": 100.0}
+        
+        def to_json(self):
+            return orjson.dumps({"symbol": self.symbol, "最新价": 100.0}).decode()
+    
+    monkeypatch.setattr(futures_analyzer, "_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(futures_analyzer, "FuturesAnalyzer", _FakeAnalyzer)
+    futures_analyzer._analyze_futures_data_cached.cache_clear()
+    
+    cache_path = tmp_path / f"ss-{date.today().isoformat()}.json"
+    cache_path.write_text('{"trunc', encoding='utf-8')
+    
+    try:
+        result = orjson.loads(analyze_futures_data("ss"))
+        print(f"结果: {result}")
+        assert "error" not in result
+        assert fetches == ["ss"]
+        assert orjson.loads(cache_path.read_text(encoding='utf-8')) == result
+        assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+        
+        # 重写后的文件可以直接命中
+        futures_analyzer._analyze_futures_data_cached.cache_clear()
+        assert orjson.loads(analyze_futures_data("ss")) == result
+        assert fetches == ["ss"]
+    finally:
+        futures_analyzer._analyze_futures_data_cached.cache_clear()
+    
+    print("\n" + "=" * 60)
+
+
 if __name__ == "__main__":
     test_futures_analyzer()
     test_analyze_futures_data()
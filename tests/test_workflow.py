@@ -1,12 +1,12 @@
 """
 工作流测试脚本 - 测试完整的并行工作流
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from dotenv import load_dotenv
-load_dotenv()
+from agents._env import ensure_env
+ensure_env()
 
 from workflow import create_workflow, analyze_futures
 
@@ -49,7 +49,7 @@ def test_analyze_futures():
         print("\n注意: 这个测试会调用API，可能需要几分钟时间...")
         print("正在分析不锈钢期货...\n")
         
-        result = analyze_futures("ss", "不锈钢")
+        result = analyze_futures("ss", "不锈钢", return_full=True)
         
         print("\n" + "-" * 60)
         print("分析结果:")
@@ -66,17 +66,17 @@ def test_analyze_futures():
             print("\n✗ 未生成最终报告")
         
         # 检查子Agent结果
-        if result.get("news_result"):
+        if result.get("news_content") is not None:
             print(f"\n✓ 新闻分析完成")
-            print(f"  结果数: {len(result['news_result'])}")
+            print(f"  输出长度: {len(result['news_content'])} 字符")
         
-        if result.get("sentiment_result"):
+        if result.get("sentiment_content") is not None:
             print(f"\n✓ 情绪分析完成")
-            print(f"  结果数: {len(result['sentiment_result'])}")
+            print(f"  输出长度: {len(result['sentiment_content'])} 字符")
         
-        if result.get("fundamental_result"):
+        if result.get("fundamental_content") is not None:
             print(f"\n✓ 基本面分析完成")
-            print(f"  结果数: {len(result['fundamental_result'])}")
+            print(f"  输出长度: {len(result['fundamental_content'])} 字符")
         
         # 检查错误
         if result.get("errors"):
@@ -113,9 +113,12 @@ def test_state_structure():
         test_state: FuturesAnalysisState = {
             "symbol": "ss",
             "keyword": "不锈钢",
-            "news_result": [],
-            "sentiment_result": [],
-            "fundamental_result": [],
+            "news_content": "",
+            "news_error": None,
+            "sentiment_content": "",
+            "sentiment_error": None,
+            "fundamental_content": "",
+            "fundamental_error": None,
             "errors": [],
             "final_report": "",
             "report_path": ""
@@ -134,6 +137,64 @@ def test_state_structure():
     print("=" * 60)
 
 
+class _MockDeepSeekHandler(BaseHTTPRequestHandler):
+    """本地模拟的 DeepSeek 对话接口，总是直接返回一段文本 (不触发工具调用)"""
+    
+    # 与真实接口一样保持长连接，连接池中才会留下绑定上一个事件循环的连接
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({
+            "id": "mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "deepseek-chat",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "模拟分析结果"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_repeated_analyze_futures(monkeypatch):
+    """同一进程内连续两次调用 analyze_futures (每次新建事件循环)，使用本地模拟接口不调用真实API"""
+    print("\n" + "=" * 60)
+    print("测试同一进程内重复调用 analyze_futures")
+    print("=" * 60)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockDeepSeekHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("DEEPSEEK_API_BASE", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("LLM_CACHE", "0")
+    
+    import tools.pdf_generator
+    monkeypatch.setattr(tools.pdf_generator, "generate_pdf_report", lambda symbol, files=None: f"mock_{symbol}.pdf")
+    
+    try:
+        # 两次使用不同品种，避免命中进程内的结果缓存
+        for symbol, keyword in (("ss", "不锈钢"), ("cu", "铜")):
+            result = analyze_futures(symbol, keyword)
+            print(f"  {symbol}: 错误 {result['errors']}")
+            assert result["errors"] == []
+            assert result["final_report"]
+    finally:
+        server.shutdown()
+    
+    print("测试通过!")
+    print("=" * 60)
+
+
 if __name__ == "__main__":
     print("开始测试工作流...")
     print("注意: 部分测试需要配置 API 密钥\n")
@@ -1,6 +1,6 @@
 """工具模块"""
 from .futures_analyzer import FuturesAnalyzer, analyze_futures_data
-from .web_search import web_search
+from .web_search import web_search, web_search_batch
 from .file_saver import (
     save_news_to_markdown, 
     save_sentiment_to_markdown, 
@@ -9,12 +9,21 @@ from .file_saver import (
     save_bearish_to_markdown,
     save_summary_to_markdown
 )
-from .pdf_generator import generate_pdf_report, PDFGenerator
+
+
+def __getattr__(name):
+    """延迟导入 PDF 相关对象，避免仅使用 Markdown 工具时加载 fpdf/markdown"""
+    if name in ("generate_pdf_report", "PDFGenerator"):
+        from . import pdf_generator
+        return getattr(pdf_generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'FuturesAnalyzer',
     'analyze_futures_data',
     'web_search',
+    'web_search_batch',
     'save_news_to_markdown',
     'save_sentiment_to_markdown',
     'save_fundamental_to_markdown',
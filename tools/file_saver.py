@@ -3,53 +3,116 @@
 """
 import os
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
 from langchain_core.tools import tool
 
 
+@lru_cache(maxsize=1)
 def _ensure_reports_dir():
-    """确保reports目录存在"""
+    """确保reports目录存在 (每个进程只创建一次)"""
     reports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports")
     os.makedirs(reports_dir, exist_ok=True)
     return reports_dir
 
 
-@tool
-def save_news_to_markdown(content: str, keyword: str = "期货") -> str:
+def _write_parts(filename: str, *parts: str) -> None:
     """
-    将新闻内容保存为Markdown格式文件
+    将多段文本依次写入文件，不拼接成一个大字符串
+    
+    支持 os.writev 的平台上通过一次系统调用写入全部片段；
+    其他平台 (Windows) 沿用文本模式写入以保留换行符转换
+    """
+    if not hasattr(os, 'writev'):
+        with open(filename, 'w', encoding='utf-8') as f:
+            for part in parts:
+                f.write(part)
+        return
+    
+    buffers = [part.encode('utf-8') for part in parts]
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        written = os.writev(fd, buffers)
+        # 极少数情况下只写入了一部分，剩余数据逐段补写
+        if written < sum(len(b) for b in buffers):
+            remaining = memoryview(b''.join(buffers))[written:]
+            while remaining:
+                remaining = remaining[os.write(fd, remaining):]
+    finally:
+        os.close(fd)
+
+
+# 报告类型 -> (报告标题, 时间字段名, 品种字段名, 报告描述)
+_TEMPLATES = {
+    "news": ("期货新闻分析报告", "搜集时间", "关键词", "新闻文件"),
+    "sentiment": ("期货市场情绪分析报告", "分析时间", "分析品种", "情绪分析文件"),
+    "fundamental": ("期货基本面技术分析报告", "分析时间", "分析品种", "基本面分析文件"),
+    "summary": ("期货综合分析报告", "报告生成时间", "分析品种", "汇总分析报告"),
+    "bullish": ("期货看涨分析报告（多头视角）", "分析时间", "分析品种", "看涨分析报告"),
+    "bearish": ("期货看跌分析报告（空头视角）", "分析时间", "分析品种", "看跌分析报告"),
+}
+
+# 报告头部中不变的片段在导入时生成: 报告类型 -> (时间之前的部分, 时间与品种之间的部分)
+_HEADER_FRAGMENTS = {
+    kind: (f"# {title}\n\n**{time_label}**: ", f"  \n**{name_label}**: ")
+    for kind, (title, time_label, name_label, _) in _TEMPLATES.items()
+}
+_HEADER_END = "\n\n---\n\n"
+
+
+def _save_markdown(kind: str, content: str, name: str, display_name: str) -> Tuple[str, Optional[str]]:
+    """
+    按模板写入报告头部和正文
     
     参数:
-        content (str): 要保存的新闻内容字符串
-        keyword (str): 搜索关键词，用于文件名
+        kind (str): 报告类型，对应 _TEMPLATES 的键，同时作为文件名前缀
+        content (str): 报告正文
+        name (str): 用于文件名的关键词或品种代码
+        display_name (str): 写入报告头部的关键词或品种
     
     返回:
-        str: 保存的文件路径
+        Tuple[str, Optional[str]]: (返回给模型的保存结果描述, 保存的文件路径，失败时为None)
     """
+    desc = _TEMPLATES[kind][3]
+    head, middle = _HEADER_FRAGMENTS[kind]
     try:
         reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"news_{keyword}_{timestamp}.md")
+        now = datetime.now()
+        filename = os.path.join(reports_dir, f"{kind}_{name}_{now.strftime('%Y%m%d_%H%M%S')}.md")
         
-        # 构建报告头部
-        header = f"""# 期货新闻分析报告
-
-**搜集时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**关键词**: {keyword}
-
----
-
-"""
+        # 头部按片段直接写入，只有时间和品种需要在调用时生成
+        parts = (head, now.strftime('%Y-%m-%d %H:%M:%S'), middle, display_name, _HEADER_END, content)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
+        try:
+            _write_parts(filename, *parts)
+        except FileNotFoundError:
+            # reports目录在运行期间被删除时重新创建
+            _ensure_reports_dir.cache_clear()
+            _ensure_reports_dir()
+            _write_parts(filename, *parts)
         
-        return f"新闻文件已成功保存至: {filename}"
+        return f"{desc}已成功保存至: {filename}", filename
     except Exception as e:
-        return f"保存新闻文件失败：{str(e)}"
+        return f"保存{desc}失败：{str(e)}", None
 
 
-@tool
-def save_sentiment_to_markdown(content: str, keyword: str = "期货") -> str:
+@tool(response_format="content_and_artifact")
+def save_news_to_markdown(content: str, keyword: str = "期货") -> Tuple[str, Optional[str]]:
+    """
+    将新闻内容保存为Markdown格式文件
+    
+    参数:
+        content (str): 要保存的新闻内容字符串
+        keyword (str): 搜索关键词，用于文件名
+    
+    返回:
+        str: 保存的文件路径
+    """
+    return _save_markdown("news", content, keyword, keyword)
+
+
+@tool(response_format="content_and_artifact")
+def save_sentiment_to_markdown(content: str, keyword: str = "期货") -> Tuple[str, Optional[str]]:
     """
     将情绪分析内容保存为Markdown格式文件
     
@@ -60,30 +123,11 @@ def save_sentiment_to_markdown(content: str, keyword: str = "期货") -> str:
     返回:
         str: 保存的文件路径
     """
-    try:
-        reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"sentiment_{keyword}_{timestamp}.md")
-        
-        header = f"""# 期货市场情绪分析报告
-
-**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**分析品种**: {keyword}
+    return _save_markdown("sentiment", content, keyword, keyword)
 
----
 
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
-        
-        return f"情绪分析文件已成功保存至: {filename}"
-    except Exception as e:
-        return f"保存情绪分析文件失败：{str(e)}"
-
-
-@tool
-def save_fundamental_to_markdown(content: str, symbol: str = "期货") -> str:
+@tool(response_format="content_and_artifact")
+def save_fundamental_to_markdown(content: str, symbol: str = "期货") -> Tuple[str, Optional[str]]:
     """
     将基本面分析内容保存为Markdown格式文件
     
@@ -94,30 +138,11 @@ def save_fundamental_to_markdown(content: str, symbol: str = "期货") -> str:
     返回:
         str: 保存的文件路径
     """
-    try:
-        reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"fundamental_{symbol}_{timestamp}.md")
-        
-        header = f"""# 期货基本面技术分析报告
+    return _save_markdown("fundamental", content, symbol, symbol.upper())
 
-**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**分析品种**: {symbol.upper()}
 
----
-
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
-        
-        return f"基本面分析文件已成功保存至: {filename}"
-    except Exception as e:
-        return f"保存基本面分析文件失败：{str(e)}"
-
-
-@tool
-def save_summary_to_markdown(content: str, symbol: str = "期货") -> str:
+@tool(response_format="content_and_artifact")
+def save_summary_to_markdown(content: str, symbol: str = "期货") -> Tuple[str, Optional[str]]:
     """
     将汇总分析报告保存为Markdown格式文件
     
@@ -128,30 +153,11 @@ def save_summary_to_markdown(content: str, symbol: str = "期货") -> str:
     返回:
         str: 保存的文件路径
     """
-    try:
-        reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"summary_{symbol}_{timestamp}.md")
-        
-        header = f"""# 期货综合分析报告
+    return _save_markdown("summary", content, symbol, symbol.upper())
 
-**报告生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**分析品种**: {symbol.upper()}
 
----
-
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
-        
-        return f"汇总分析报告已成功保存至: {filename}"
-    except Exception as e:
-        return f"保存汇总分析报告失败：{str(e)}"
-
-
-@tool
-def save_bullish_to_markdown(content: str, symbol: str = "期货") -> str:
+@tool(response_format="content_and_artifact")
+def save_bullish_to_markdown(content: str, symbol: str = "期货") -> Tuple[str, Optional[str]]:
     """
     将看涨分析报告保存为Markdown格式文件
     
@@ -162,30 +168,11 @@ def save_bullish_to_markdown(content: str, symbol: str = "期货") -> str:
     返回:
         str: 保存的文件路径
     """
-    try:
-        reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"bullish_{symbol}_{timestamp}.md")
-        
-        header = f"""# 期货看涨分析报告（多头视角）
-
-**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**分析品种**: {symbol.upper()}
-
----
-
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
-        
-        return f"看涨分析报告已成功保存至: {filename}"
-    except Exception as e:
-        return f"保存看涨分析报告失败：{str(e)}"
+    return _save_markdown("bullish", content, symbol, symbol.upper())
 
 
-@tool
-def save_bearish_to_markdown(content: str, symbol: str = "期货") -> str:
+@tool(response_format="content_and_artifact")
+def save_bearish_to_markdown(content: str, symbol: str = "期货") -> Tuple[str, Optional[str]]:
     """
     将看跌分析报告保存为Markdown格式文件
     
@@ -196,26 +183,7 @@ def save_bearish_to_markdown(content: str, symbol: str = "期货") -> str:
     返回:
         str: 保存的文件路径
     """
-    try:
-        reports_dir = _ensure_reports_dir()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(reports_dir, f"bearish_{symbol}_{timestamp}.md")
-        
-        header = f"""# 期货看跌分析报告（空头视角）
-
-**分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**分析品种**: {symbol.upper()}
-
----
-
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(header + content)
-        
-        return f"看跌分析报告已成功保存至: {filename}"
-    except Exception as e:
-        return f"保存看跌分析报告失败：{str(e)}"
+    return _save_markdown("bearish", content, symbol, symbol.upper())
 
 
 if __name__ == "__main__":
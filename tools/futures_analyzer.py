@@ -10,12 +10,58 @@
 依赖: akshare, pandas, numpy
 """
 
+import os
+import tempfile
 import akshare as ak
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Union
 import json
+import orjson
+
+# 基本面分析结果的磁盘缓存目录
+_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports", ".cache")
+
+
+@lru_cache(maxsize=32)
+def _fetch_sina_daily(sina_symbol: str, trading_date: date) -> pd.DataFrame:
+    """
+    获取新浪接口的全部日线数据，同一合约当天只请求一次
+    
+    参数:
+        sina_symbol (str): 新浪合约代码, 如 "SS0"
+        trading_date (date): 当天日期，仅作为缓存键，跨天后重新请求
+    
+    返回:
+        pd.DataFrame: 日期列已解析的数据，各分析器共享，调用方不应修改
+    """
+    data = ak.futures_zh_daily_sina(symbol=sina_symbol)
+    data['date'] = pd.to_datetime(data['date'])
+    return data
+
+
+def _last_mean(values: np.ndarray, window: int) -> float:
+    """最后 window 个值的均值，数据不足时返回 NaN"""
+    if len(values) < window:
+        return np.nan
+    return values[-window:].mean()
+
+
+def _ema(values: np.ndarray, *spans: int) -> np.ndarray:
+    """
+    一次遍历同时计算多个周期的指数移动平均
+    
+    等价于 pandas ewm(span=span, adjust=False).mean()，返回形状为 (len(spans), len(values))
+    """
+    alpha = 2.0 / (np.array(spans, dtype=np.float64) + 1)
+    out = np.empty((len(spans), len(values)))
+    prev = np.full(len(spans), values[0] if len(values) > 0 else np.nan)
+    for i, v in enumerate(values):
+        prev = alpha * v + (1 - alpha) * prev
+        out[:, i] = prev
+    return out
 
 
 class FuturesAnalyzer:
@@ -36,57 +82,50 @@ class FuturesAnalyzer:
         >>> indicators = analyzer.get_key_indicators()
     """
     
-    # 品种代码到中文名称的映射 (用于东方财富接口)
-    SYMBOL_TO_CHINESE = {
-        'pb': '铅', 'rb': '螺纹钢', 'cu': '铜', 'al': '铝', 'zn': '锌', 'ni': '镍', 'sn': '锡',
-        'au': '黄金', 'ag': '白银', 'hc': '热轧卷板', 'fu': '燃料油', 'bu': '石油沥青',
-        'ru': '天然橡胶', 'br': '合成橡胶', 'sp': '纸浆', 'wr': '线材', 'ss': '不锈钢',
-        'ao': '氧化铝',
-        # 能源
-        'sc': '原油', 'nr': '20号胶', 'lu': '低硫燃料油', 'bc': '国际铜',
-        # 大连商品
-        'm': '豆粕', 'y': '豆油', 'a': '豆一', 'b': '豆二', 'p': '棕榈油', 'c': '玉米',
-        'cs': '玉米淀粉', 'l': '聚乙烯', 'v': 'PVC', 'pp': '聚丙烯', 'j': '焦炭',
-        'jm': '焦煤', 'i': '铁矿石', 'fb': '纤维板', 'bb': '胶合板', 'eg': '乙二醇',
-        'rr': '粳米', 'eb': '苯乙烯', 'pg': '液化石油气', 'lh': '生猪', 'lg': '原木',
-        # 郑州商品
-        'sr': '白砂糖', 'cf': '棉花', 'ta': 'PTA', 'oi': '菜籽油', 'rm': '菜粕',
-        'ma': '甲醇', 'fg': '玻璃', 'zc': '动力煤', 'sf': '硅铁', 'sm': '锰硅',
-        'cy': '棉纱', 'ap': '苹果', 'cj': '红枣', 'ur': '尿素', 'sa': '纯碱',
-        'pf': '短纤', 'pk': '花生', 'px': '对二甲苯', 'sh': '烧碱', 'pr': '瓶片',
-        # 广州期货
-        'si': '工业硅', 'lc': '碳酸锂', 'ps': '多晶硅',
-        # 金融期货
-        'if': '沪深300指数', 'ih': '上证50指数', 'ic': '中证500指数', 'im': '中证1000指数',
-        'ts': '2年期国债', 'tf': '5年期国债', 't': '10年期国债', 'tl': '30年期国债',
-    }
-    
-    # 品种代码到交易所的映射
-    SYMBOL_TO_EXCHANGE = {
+    # 品种代码 -> (中文名称, 交易所)，中文名称用于东方财富接口
+    SYMBOLS = {
         # 上海期货交易所
-        'pb': 'SHFE', 'rb': 'SHFE', 'cu': 'SHFE', 'al': 'SHFE', 'zn': 'SHFE', 
-        'ni': 'SHFE', 'sn': 'SHFE', 'au': 'SHFE', 'ag': 'SHFE', 'hc': 'SHFE',
-        'fu': 'SHFE', 'bu': 'SHFE', 'ru': 'SHFE', 'br': 'SHFE', 'sp': 'SHFE',
-        'wr': 'SHFE', 'ss': 'SHFE', 'ao': 'SHFE',
+        'pb': ('铅', 'SHFE'), 'rb': ('螺纹钢', 'SHFE'), 'cu': ('铜', 'SHFE'), 'al': ('铝', 'SHFE'),
+        'zn': ('锌', 'SHFE'), 'ni': ('镍', 'SHFE'), 'sn': ('锡', 'SHFE'), 'au': ('黄金', 'SHFE'),
+        'ag': ('白银', 'SHFE'), 'hc': ('热轧卷板', 'SHFE'), 'fu': ('燃料油', 'SHFE'),
+        'bu': ('石油沥青', 'SHFE'), 'ru': ('天然橡胶', 'SHFE'), 'br': ('合成橡胶', 'SHFE'),
+        'sp': ('纸浆', 'SHFE'), 'wr': ('线材', 'SHFE'), 'ss': ('不锈钢', 'SHFE'),
+        'ao': ('氧化铝', 'SHFE'),
         # 上海国际能源
-        'sc': 'INE', 'nr': 'INE', 'lu': 'INE', 'bc': 'INE',
+        'sc': ('原油', 'INE'), 'nr': ('20号胶', 'INE'), 'lu': ('低硫燃料油', 'INE'),
+        'bc': ('国际铜', 'INE'),
         # 大连商品
-        'm': 'DCE', 'y': 'DCE', 'a': 'DCE', 'b': 'DCE', 'p': 'DCE', 'c': 'DCE',
-        'cs': 'DCE', 'l': 'DCE', 'v': 'DCE', 'pp': 'DCE', 'j': 'DCE',
-        'jm': 'DCE', 'i': 'DCE', 'fb': 'DCE', 'bb': 'DCE', 'eg': 'DCE',
-        'rr': 'DCE', 'eb': 'DCE', 'pg': 'DCE', 'lh': 'DCE', 'lg': 'DCE',
+        'm': ('豆粕', 'DCE'), 'y': ('豆油', 'DCE'), 'a': ('豆一', 'DCE'), 'b': ('豆二', 'DCE'),
+        'p': ('棕榈油', 'DCE'), 'c': ('玉米', 'DCE'), 'cs': ('玉米淀粉', 'DCE'), 'l': ('聚乙烯', 'DCE'),
+        'v': ('PVC', 'DCE'), 'pp': ('聚丙烯', 'DCE'), 'j': ('焦炭', 'DCE'), 'jm': ('焦煤', 'DCE'),
+        'i': ('铁矿石', 'DCE'), 'fb': ('纤维板', 'DCE'), 'bb': ('胶合板', 'DCE'), 'eg': ('乙二醇', 'DCE'),
+        'rr': ('粳米', 'DCE'), 'eb': ('苯乙烯', 'DCE'), 'pg': ('液化石油气', 'DCE'), 'lh': ('生猪', 'DCE'),
+        'lg': ('原木', 'DCE'),
         # 郑州商品
-        'sr': 'CZCE', 'cf': 'CZCE', 'ta': 'CZCE', 'oi': 'CZCE', 'rm': 'CZCE',
-        'ma': 'CZCE', 'fg': 'CZCE', 'zc': 'CZCE', 'sf': 'CZCE', 'sm': 'CZCE',
-        'cy': 'CZCE', 'ap': 'CZCE', 'cj': 'CZCE', 'ur': 'CZCE', 'sa': 'CZCE',
-        'pf': 'CZCE', 'pk': 'CZCE', 'px': 'CZCE', 'sh': 'CZCE', 'pr': 'CZCE',
+        'sr': ('白砂糖', 'CZCE'), 'cf': ('棉花', 'CZCE'), 'ta': ('PTA', 'CZCE'),
+        'oi': ('菜籽油', 'CZCE'), 'rm': ('菜粕', 'CZCE'), 'ma': ('甲醇', 'CZCE'), 'fg': ('玻璃', 'CZCE'),
+        'zc': ('动力煤', 'CZCE'), 'sf': ('硅铁', 'CZCE'), 'sm': ('锰硅', 'CZCE'), 'cy': ('棉纱', 'CZCE'),
+        'ap': ('苹果', 'CZCE'), 'cj': ('红枣', 'CZCE'), 'ur': ('尿素', 'CZCE'), 'sa': ('纯碱', 'CZCE'),
+        'pf': ('短纤', 'CZCE'), 'pk': ('花生', 'CZCE'), 'px': ('对二甲苯', 'CZCE'),
+        'sh': ('烧碱', 'CZCE'), 'pr': ('瓶片', 'CZCE'),
         # 广州期货
-        'si': 'GFEX', 'lc': 'GFEX', 'ps': 'GFEX',
+        'si': ('工业硅', 'GFEX'), 'lc': ('碳酸锂', 'GFEX'), 'ps': ('多晶硅', 'GFEX'),
         # 金融期货
-        'if': 'CFFEX', 'ih': 'CFFEX', 'ic': 'CFFEX', 'im': 'CFFEX',
-        'ts': 'CFFEX', 'tf': 'CFFEX', 't': 'CFFEX', 'tl': 'CFFEX',
+        'if': ('沪深300指数', 'CFFEX'), 'ih': ('上证50指数', 'CFFEX'), 'ic': ('中证500指数', 'CFFEX'),
+        'im': ('中证1000指数', 'CFFEX'), 'ts': ('2年期国债', 'CFFEX'), 'tf': ('5年期国债', 'CFFEX'),
+        't': ('10年期国债', 'CFFEX'), 'tl': ('30年期国债', 'CFFEX'),
     }
     
+    # 由 SYMBOLS 派生的映射表
+    SYMBOL_TO_CHINESE = {code: name for code, (name, _) in SYMBOLS.items()}
+    SYMBOL_TO_EXCHANGE = {code: exchange for code, (_, exchange) in SYMBOLS.items()}
+    
+    # 按代码排序的 (代码, 中文名, 交易所) 列表，类定义时生成一次
+    SYMBOL_LIST = tuple(sorted((code, name, exchange) for code, (name, exchange) in SYMBOLS.items()))
+    
+    # 品种代码 -> 可用的数据源，记录新浪接口失败、需要直接走东财接口的品种
+    _SOURCE_CACHE: Dict[str, str] = {}
+    
     def __init__(self, symbol: str):
         """
         初始化期货分析器
@@ -95,9 +134,11 @@ class FuturesAnalyzer:
             symbol (str): 期货品种代码, 如 "pb", "RB" 等 (不区分大小写)
         """
         self.symbol = symbol.lower()
-        self.chinese_name = self.SYMBOL_TO_CHINESE.get(self.symbol, self.symbol)
-        self.exchange = self.SYMBOL_TO_EXCHANGE.get(self.symbol, 'UNKNOWN')
+        self.chinese_name, self.exchange = self.SYMBOLS.get(self.symbol, (self.symbol, 'UNKNOWN'))
         self._data_cache = None  # 缓存数据
+        self._date_ns = None  # 缓存数据的日期列 (int64 纳秒)
+        self._recent_cache = None  # 缓存最近30天数据
+        self._indicators_cache = None  # 缓存技术指标
         
     def _get_sina_symbol(self) -> str:
         """获取新浪接口的合约代码 (如 PB0)"""
@@ -128,45 +169,75 @@ class FuturesAnalyzer:
                 - change_pct: 涨跌幅% (东财数据)
                 - amount: 成交额 (东财数据)
         """
+        if use_cache and self._recent_cache is not None:
+            return self._recent_cache
+        
         if use_cache and self._data_cache is not None:
             data = self._data_cache
+        elif self._SOURCE_CACHE.get(self.symbol) == 'em':
+            # 新浪接口曾失败的品种直接使用东财接口，东财也失败时下次重新尝试新浪
+            try:
+                data = self._fetch_em()
+            except ValueError:
+                self._SOURCE_CACHE.pop(self.symbol, None)
+                raise
+            self._cache_data(data)
         else:
             # 使用新浪接口获取数据
             try:
-                sina_symbol = self._get_sina_symbol()
-                data = ak.futures_zh_daily_sina(symbol=sina_symbol)
-                data['date'] = pd.to_datetime(data['date'])
-                self._data_cache = data
+                data = self._fetch_sina(use_cache)
             except Exception as e:
                 print(f"新浪接口获取失败, 尝试东财接口: {e}")
-                try:
-                    em_symbol = self._get_em_symbol()
-                    data = ak.futures_hist_em(symbol=em_symbol, period="daily")
-                    data.rename(columns={
-                        '时间': 'date', '开盘': 'open', '最高': 'high', 
-                        '最低': 'low', '收盘': 'close', '成交量': 'volume',
-                        '持仓量': 'hold', '涨跌': 'change', '涨跌幅': 'change_pct',
-                        '成交额': 'amount'
-                    }, inplace=True)
-                    data['date'] = pd.to_datetime(data['date'])
-                    self._data_cache = data
-                except Exception as e2:
-                    raise ValueError(f"无法获取品种 {self.symbol} 的数据: {e2}")
+                data = self._fetch_em()
+                self._SOURCE_CACHE[self.symbol] = 'em'
+            self._cache_data(data)
         
         # 获取最近30天的数据
         end_date = datetime.now()
         start_date = end_date - timedelta(days=45)  # 多取一些天数确保包含交易日
         
-        recent_data = data[data['date'] >= start_date].copy()
-        recent_data = recent_data.tail(30)  # 取最近30条记录
-        recent_data = recent_data.reset_index(drop=True)
+        # 直接比较 int64 纳秒时间戳，取最近30条记录
+        positions = np.flatnonzero(self._date_ns >= pd.Timestamp(start_date).value)[-30:]
+        recent_data = data.iloc[positions].reset_index(drop=True)
+        
+        # 数据更新后，之前计算的指标随之失效
+        self._recent_cache = recent_data
+        self._indicators_cache = None
         
         return recent_data
     
-    def get_key_indicators(self) -> Dict[str, Union[float, int, str]]:
+    def _fetch_sina(self, use_cache: bool = True) -> pd.DataFrame:
+        """从新浪接口获取全部日线数据，use_cache 为 False 时跳过当天的共享缓存"""
+        fetch = _fetch_sina_daily if use_cache else _fetch_sina_daily.__wrapped__
+        return fetch(self._get_sina_symbol(), date.today())
+    
+    def _fetch_em(self) -> pd.DataFrame:
+        """从东财接口获取全部日线数据，并统一列名"""
+        try:
+            data = ak.futures_hist_em(symbol=self._get_em_symbol(), period="daily")
+            data.rename(columns={
+                '时间': 'date', '开盘': 'open', '最高': 'high', 
+                '最低': 'low', '收盘': 'close', '成交量': 'volume',
+                '持仓量': 'hold', '涨跌': 'change', '涨跌幅': 'change_pct',
+                '成交额': 'amount'
+            }, inplace=True)
+            data['date'] = pd.to_datetime(data['date'])
+            return data
+        except Exception as e:
+            raise ValueError(f"无法获取品种 {self.symbol} 的数据: {e}")
+    
+    def _cache_data(self, data: pd.DataFrame):
+        """缓存原始数据，并预先把日期列转换为 int64 纳秒供切片比较"""
+        self._data_cache = data
+        self._date_ns = data['date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    
+    def get_key_indicators(self, use_cache: bool = True) -> Dict[str, Union[float, int, str]]:
         """
         获取期货品种的重要技术指标
         
+        参数:
+            use_cache (bool): 是否使用已计算的指标, 默认True
+            
         返回:
             Dict: 包含以下重要指标:
                 - 基础价格指标: 最新价、开盘价、最高价、最低价、结算价
@@ -175,6 +246,9 @@ class FuturesAnalyzer:
                 - 技术指标: MA5, MA10, MA20, MA30, 波动率, RSI
                 - 统计指标: 30日均价、30日最高、30日最低、振幅
         """
+        if use_cache and self._indicators_cache is not None:
+            return self._indicators_cache
+        
         data = self.get_recent_30_days()
         
         if len(data) == 0:
@@ -211,30 +285,28 @@ class FuturesAnalyzer:
             '结算价': round(latest['settle'], 2) if 'settle' in latest and pd.notna(latest['settle']) else None,
         }
         
-        # 计算移动平均线
-        data['MA5'] = data['close'].rolling(window=5).mean()
-        data['MA10'] = data['close'].rolling(window=10).mean()
-        data['MA20'] = data['close'].rolling(window=20).mean()
-        data['MA30'] = data['close'].rolling(window=30).mean()
+        # 在 NumPy 数组上只计算最新一天的指标值，不向 DataFrame 添加列
+        close = data['close'].to_numpy(dtype=np.float64)
         
-        # 计算RSI (相对强弱指标)
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        data['RSI'] = 100 - (100 / (1 + rs))
+        # 计算RSI (相对强弱指标)，首日涨跌记为0
+        delta = np.diff(close, prepend=close[0])
+        gain = _last_mean(np.where(delta > 0, delta, 0.0), 14)
+        loss = _last_mean(np.where(delta < 0, -delta, 0.0), 14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + np.float64(gain) / loss))
         
         # 计算波动率 (标准差)
-        data['returns'] = data['close'].pct_change()
-        volatility = data['returns'].std() * np.sqrt(252) * 100  # 年化波动率
+        returns = np.diff(close) / close[:-1]
+        volatility = returns.std(ddof=1) * np.sqrt(252) * 100 if len(returns) > 1 else np.nan  # 年化波动率
         
         # 添加技术指标
+        ma5, ma10, ma20, ma30 = (_last_mean(close, n) for n in (5, 10, 20, 30))
         indicators.update({
-            'MA5': round(data['MA5'].iloc[-1], 2) if pd.notna(data['MA5'].iloc[-1]) else None,
-            'MA10': round(data['MA10'].iloc[-1], 2) if pd.notna(data['MA10'].iloc[-1]) else None,
-            'MA20': round(data['MA20'].iloc[-1], 2) if pd.notna(data['MA20'].iloc[-1]) else None,
-            'MA30': round(data['MA30'].iloc[-1], 2) if pd.notna(data['MA30'].iloc[-1]) else None,
-            'RSI(14)': round(data['RSI'].iloc[-1], 2) if pd.notna(data['RSI'].iloc[-1]) else None,
+            'MA5': round(ma5, 2) if pd.notna(ma5) else None,
+            'MA10': round(ma10, 2) if pd.notna(ma10) else None,
+            'MA20': round(ma20, 2) if pd.notna(ma20) else None,
+            'MA30': round(ma30, 2) if pd.notna(ma30) else None,
+            'RSI(14)': round(rsi, 2) if pd.notna(rsi) else None,
             '年化波动率%': round(volatility, 2) if pd.notna(volatility) else None,
         })
         
@@ -248,19 +320,20 @@ class FuturesAnalyzer:
             '30日平均成交量': int(data['volume'].mean()),
         })
         
-        # 计算MACD
-        exp1 = data['close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['close'].ewm(span=26, adjust=False).mean()
-        data['MACD'] = exp1 - exp2
-        data['Signal'] = data['MACD'].ewm(span=9, adjust=False).mean()
-        data['Histogram'] = data['MACD'] - data['Signal']
+        # 计算MACD (EMA 需完整递推，只取最后一个值)
+        ema12, ema26 = _ema(close, 12, 26)
+        macd = ema12 - ema26
+        signal = _ema(macd, 9)[0]
+        macd, signal = macd[-1], signal[-1]
+        histogram = macd - signal
         
         indicators.update({
-            'MACD': round(data['MACD'].iloc[-1], 4) if pd.notna(data['MACD'].iloc[-1]) else None,
-            'MACD_Signal': round(data['Signal'].iloc[-1], 4) if pd.notna(data['Signal'].iloc[-1]) else None,
-            'MACD_Histogram': round(data['Histogram'].iloc[-1], 4) if pd.notna(data['Histogram'].iloc[-1]) else None,
+            'MACD': round(macd, 4) if pd.notna(macd) else None,
+            'MACD_Signal': round(signal, 4) if pd.notna(signal) else None,
+            'MACD_Histogram': round(histogram, 4) if pd.notna(histogram) else None,
         })
         
+        self._indicators_cache = indicators
         return indicators
     
     def get_all_data(self, days: int = 365) -> pd.DataFrame:
@@ -274,9 +347,7 @@ class FuturesAnalyzer:
             pd.DataFrame: 历史数据
         """
         try:
-            sina_symbol = self._get_sina_symbol()
-            data = ak.futures_zh_daily_sina(symbol=sina_symbol)
-            data['date'] = pd.to_datetime(data['date'])
+            data = _fetch_sina_daily(self._get_sina_symbol(), date.today())
             
             # 过滤指定天数
             end_date = datetime.now()
@@ -307,16 +378,11 @@ class FuturesAnalyzer:
     def to_json(self) -> str:
         """将关键指标转换为JSON字符串"""
         indicators = self.get_key_indicators()
-        # 处理None值和特殊类型
-        cleaned = {}
-        for k, v in indicators.items():
-            if v is None:
-                cleaned[k] = None
-            elif isinstance(v, (np.integer, np.floating)):
-                cleaned[k] = float(v)
-            else:
-                cleaned[k] = v
-        return json.dumps(cleaned, ensure_ascii=False, indent=2)
+        # orjson 直接序列化 numpy 标量，无需逐项转换
+        return orjson.dumps(
+            indicators,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
     
     def display_summary(self):
         """打印品种数据摘要"""
@@ -357,6 +423,82 @@ class FuturesAnalyzer:
         print("=" * 60)
 
 
+@lru_cache(maxsize=64)
+def _analyze_futures_data_cached(symbol: str, day: str) -> str:
+    """
+    按 (品种, 日期) 缓存分析结果
+    
+    同一天内行情数据不变，先查内存缓存，再查 reports/.cache/{symbol}-{day}.json，
+    都没有时才请求接口并写入磁盘，同时清理往日的缓存文件。
+    缓存文件损坏或无法读取时按未命中处理并删除该文件。
+    获取失败或没有数据时抛出异常，不会被缓存。
+    """
+    cache_path = os.path.join(_CACHE_DIR, f"{symbol}-{day}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = f.read()
+            # 忽略旧版本写入的错误结果
+            if "error" not in orjson.loads(cached):
+                return cached
+        except (OSError, UnicodeDecodeError, orjson.JSONDecodeError):
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+    
+    analyzer = FuturesAnalyzer(symbol)
+    indicators = analyzer.get_key_indicators()
+    if "error" in indicators:
+        raise ValueError(f"品种 {symbol} {indicators['error']}")
+    result = analyzer.to_json()
+    
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        _prune_cache_dir(day)
+        # 先写临时文件再原子替换，避免其他读取方看到写了一半的缓存
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=_CACHE_DIR, suffix=".tmp", delete=False
+        ) as f:
+            f.write(result)
+        try:
+            os.replace(f.name, cache_path)
+        except OSError:
+            os.remove(f.name)
+            raise
+    except OSError:
+        pass  # 磁盘缓存失败不影响返回结果
+    
+    return result
+
+
+def _prune_cache_dir(day: str):
+    """删除 reports/.cache 中非当天的分析结果文件"""
+    suffix = f"-{day}.json"
+    for name in os.listdir(_CACHE_DIR):
+        if name.endswith(".json") and not name.endswith(suffix):
+            try:
+                os.remove(os.path.join(_CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+def clear_data_cache(symbol: str):
+    """
+    清除品种当天的行情与分析缓存，下次调用 analyze_futures_data 时重新请求接口
+    
+    参数:
+        symbol (str): 期货品种代码 (不区分大小写)
+    """
+    _fetch_sina_daily.cache_clear()
+    _analyze_futures_data_cached.cache_clear()
+    cache_path = os.path.join(_CACHE_DIR, f"{symbol.lower()}-{date.today().isoformat()}.json")
+    try:
+        os.remove(cache_path)
+    except OSError:
+        pass
+
+
 # 便捷函数，供LangChain工具调用
 def analyze_futures_data(symbol: str) -> str:
     """
@@ -369,8 +511,7 @@ def analyze_futures_data(symbol: str) -> str:
         str: JSON格式的基本面分析报告
     """
     try:
-        analyzer = FuturesAnalyzer(symbol)
-        return analyzer.to_json()
+        return _analyze_futures_data_cached(symbol.lower(), date.today().isoformat())
     except Exception as e:
         return json.dumps({"error": str(e)}, ensure_ascii=False)
 
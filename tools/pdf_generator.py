@@ -1,18 +1,57 @@
 """
 PDF 生成工具 - 将多个 Markdown 文件合并为 PDF
 """
+import mmap
 import os
-import glob
 import re
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from markdown import markdown
 from fpdf import FPDF
 
 logger = logging.getLogger(__name__)
 
+# md_to_text 使用的正则，模块加载时编译一次
+_CODE_FENCE_OPEN = re.compile(r'```[\w]*\n')
+_CODE_FENCE = re.compile(r'```\n?')
+_HEADING = re.compile(r'^(#{1,4}) (.*?)$', re.MULTILINE)
+_TABLE_RULE = re.compile(r'^[\s\-\|]+$', re.MULTILINE)
+_BULLET = re.compile(r'^\s*[-*+]\s', re.MULTILINE)
+_NUMBERED = re.compile(r'^\s*\d+\.\s', re.MULTILINE)
+_LINK = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]+\)')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+# 报告章节: (文件名前缀, 章节标题)，顺序即 PDF 中的默认顺序
+_SECTIONS = (
+    ('fundamental', '一、基本面技术分析报告'),
+    ('news', '二、新闻分析报告'),
+    ('sentiment', '三、市场情绪分析报告'),
+    ('bullish', '四、看涨分析报告（多头视角）'),
+    ('bearish', '五、看跌分析报告（空头视角）'),
+    ('summary', '六、综合投资报告'),
+)
+_SECTION_KINDS = tuple(kind for kind, _ in _SECTIONS)
+_SECTION_TITLES = dict(_SECTIONS)
+
+# 内置字体 (latin-1) 无法编码的字符
+_NON_LATIN1 = re.compile(r'[^\x00-\xff]')
+
+# 标题级别 -> 转换后的格式
+_HEADING_FORMATS = {
+    1: '\n\n【{}】\n',
+    2: '\n【{}】\n',
+    3: '\n{}\n',
+    4: '\n{}\n',
+}
+
+
+def _format_heading(match: re.Match) -> str:
+    """按 # 的数量转换标题行"""
+    return _HEADING_FORMATS[len(match.group(1))].format(match.group(2))
+
 
 class PDFGenerator:
     """
@@ -46,48 +85,35 @@ class PDFGenerator:
         返回:
             dict: 各类型报告的文件路径
         """
-        files = {
-            'fundamental': None,
-            'news': None,
-            'sentiment': None,
-            'bullish': None,
-            'bearish': None,
-            'summary': None
-        }
-        
-        # 获取所有文件
-        all_files = glob.glob(os.path.join(self.reports_dir, "*.md"))
-        
-        # 按修改时间排序（最新的在前）
-        all_files.sort(key=os.path.getmtime, reverse=True)
+        files = dict.fromkeys(_SECTION_KINDS)
         
-        # 按类型查找最新的文件
         # 使用时间窗口：只查找最近 10 分钟内生成的文件
         current_time = datetime.now().timestamp()
         time_window = 600  # 10 分钟 = 600 秒
         
-        for file_path in all_files:
-            # 检查文件是否在时间窗口内
-            file_mtime = os.path.getmtime(file_path)
-            if current_time - file_mtime > time_window:
-                continue  # 跳过太旧的文件
-            
-            basename = os.path.basename(file_path).lower()
-            
-            # 更宽松的匹配：只检查前缀，不严格要求符号完全匹配
-            # 这样可以处理文件名中有特殊字符的情况
-            if files['fundamental'] is None and basename.startswith('fundamental_'):
-                files['fundamental'] = file_path
-            elif files['news'] is None and basename.startswith('news_'):
-                files['news'] = file_path
-            elif files['sentiment'] is None and basename.startswith('sentiment_'):
-                files['sentiment'] = file_path
-            elif files['bullish'] is None and basename.startswith('bullish_'):
-                files['bullish'] = file_path
-            elif files['bearish'] is None and basename.startswith('bearish_'):
-                files['bearish'] = file_path
-            elif files['summary'] is None and basename.startswith('summary_'):
-                files['summary'] = file_path
+        # 一次目录扫描取得文件名和修改时间，每个文件只 stat 一次
+        recent_files = []
+        try:
+            with os.scandir(self.reports_dir) as it:
+                for entry in it:
+                    if entry.name.startswith('.') or not entry.name.endswith('.md'):
+                        continue
+                    file_mtime = entry.stat().st_mtime
+                    if current_time - file_mtime > time_window:
+                        continue  # 跳过太旧的文件
+                    recent_files.append((file_mtime, entry.name, entry.path))
+        except FileNotFoundError:
+            return files
+        
+        # 按修改时间排序（最新的在前）
+        recent_files.sort(key=lambda item: item[0], reverse=True)
+        
+        # 按类型查找最新的文件
+        for _, name, file_path in recent_files:
+            # 只按文件名前缀归类，不要求符号完全匹配，每类只保留最新的一个
+            section = name.lower().split('_', 1)[0]
+            if section in files and files[section] is None:
+                files[section] = file_path
             
             # 如果都找到了，提前退出
             if all(files.values()):
@@ -96,10 +122,21 @@ class PDFGenerator:
         return files
     
     def read_markdown_file(self, file_path: str) -> str:
-        """读取 Markdown 文件内容"""
+        """
+        读取 Markdown 文件内容
+        
+        通过 mmap 映射文件并直接解码，不经过中间的 bytes 副本
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'utf-8')
+            # 与文本模式读取一致，统一换行符
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            return text
         except Exception as e:
             return f"\n\n**[读取文件失败: {e}]**\n\n"
     
@@ -110,38 +147,31 @@ class PDFGenerator:
         简化处理，移除 markdown 语法但保留段落结构
         """
         # 移除代码块标记
-        text = re.sub(r'```[\w]*\n', '\n', md_content)
-        text = re.sub(r'```\n?', '', text)
+        text = _CODE_FENCE_OPEN.sub('\n', md_content)
+        text = _CODE_FENCE.sub('', text)
         
-        # 转换标题为带格式的文本
-        text = re.sub(r'^# (.*?)$', r'\n\n【\1】\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^## (.*?)$', r'\n【\1】\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^### (.*?)$', r'\n\1\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#### (.*?)$', r'\n\1\n', text, flags=re.MULTILINE)
+        # 转换标题为带格式的文本 (各级标题一次扫描完成)
+        text = _HEADING.sub(_format_heading, text)
         
         # 移除表格标记
-        text = re.sub(r'\|', ' | ', text)
-        text = re.sub(r'^[\s\-\|]+$', '', text, flags=re.MULTILINE)
+        text = text.replace('|', ' | ')
+        text = _TABLE_RULE.sub('', text)
         
         # 转换列表
-        text = re.sub(r'^\s*[-*+]\s', '  • ', text, flags=re.MULTILINE)
-        text = re.sub(r'^\s*\d+\.\s', '  ', text, flags=re.MULTILINE)
+        text = _BULLET.sub('  • ', text)
+        text = _NUMBERED.sub('  ', text)
         
         # 移除加粗和斜体标记
-        text = re.sub(r'\*\*\*', '', text)
-        text = re.sub(r'\*\*', '', text)
-        text = re.sub(r'\*', '', text)
-        text = re.sub(r'__', '', text)
-        text = re.sub(r'_', '', text)
+        text = text.replace('*', '').replace('_', '')
         
         # 移除链接标记，保留文本
-        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+        text = _LINK.sub(r'\1', text)
         
         # 移除图片标记
-        text = re.sub(r'!\[([^\]]*)\]\([^)]+\)', '', text)
+        text = _IMAGE.sub('', text)
         
         # 清理多余空行
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _BLANK_LINES.sub('\n\n', text)
         
         return text.strip()
     
@@ -184,40 +214,32 @@ class PDFGenerator:
                 except:
                     continue
         
-        if not font_added:
-            pdf.set_font('Arial', '', 12)
-        else:
-            pdf.set_font('CN', '', 12)
+        # 字体族只需确定一次
+        family = 'CN' if font_added else 'Arial'
+        pdf.set_font(family, '', 12)
         
         # 添加标题
         if title:
-            if font_added:
-                pdf.set_font('CN', 'B', 20)
-            else:
-                pdf.set_font('Arial', 'B', 20)
+            pdf.set_font(family, 'B', 20)
             pdf.cell(0, 15, title, ln=True, align='C')
             pdf.ln(5)
         
         # 添加副标题
-        if font_added:
-            pdf.set_font('CN', '', 10)
-        else:
-            pdf.set_font('Arial', '', 10)
+        pdf.set_font(family, '', 10)
         pdf.cell(0, 8, f"品种代码: {symbol.upper()}  |  生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align='C')
         pdf.ln(10)
         
         # 添加内容
-        if font_added:
-            pdf.set_font('CN', '', 10)
-        else:
-            pdf.set_font('Arial', '', 10)
+        pdf.set_font(family, '', 10)
         
         # 获取可用宽度（页面宽度减去左右边距）
         available_width = pdf.w - pdf.l_margin - pdf.r_margin
         
+        # 内置字体只支持 latin-1，无法编码的行预先跳过，不进入异常路径
+        unsupported = None if font_added else _NON_LATIN1
+        
         # 分行写入内容
-        lines = content.split('\n')
-        for line in lines:
+        for line in content.split('\n'):
             line = line.strip()
             if not line:
                 pdf.ln(3)
@@ -225,25 +247,20 @@ class PDFGenerator:
             
             # 检测是否是标题行
             if line.startswith('【') and line.endswith('】'):
-                if font_added:
-                    pdf.set_font('CN', 'B', 14)
-                else:
-                    pdf.set_font('Arial', 'B', 14)
+                pdf.set_font(family, 'B', 14)
                 pdf.ln(5)
                 # 使用 available_width 而不是 0
                 pdf.multi_cell(available_width, 10, line, ln=True)
-                if font_added:
-                    pdf.set_font('CN', '', 10)
-                else:
-                    pdf.set_font('Arial', '', 10)
+                pdf.set_font(family, '', 10)
+            elif unsupported is not None and unsupported.search(line):
+                logger.warning(f"PDF 写入行失败，跳过: {line[:50]}... 错误: 内置字体无法显示该行字符")
             else:
                 # 普通文本，自动换行，使用 available_width
                 try:
                     pdf.multi_cell(available_width, 6, line, ln=True)
                 except Exception as e:
-                    # 如果某行出错，跳过该行
+                    # 个别异常行跳过
                     logger.warning(f"PDF 写入行失败，跳过: {line[:50]}... 错误: {e}")
-                    continue
         
         # 保存 PDF
         pdf.output(output_path)
@@ -252,7 +269,8 @@ class PDFGenerator:
         self, 
         symbol: str, 
         output_filename: str = None,
-        order: List[str] = None
+        order: List[str] = None,
+        files: Optional[Dict[str, str]] = None
     ) -> str:
         """
         合并报告为 PDF
@@ -261,18 +279,23 @@ class PDFGenerator:
             symbol: 期货品种代码
             output_filename: 输出文件名，默认自动生成
             order: 报告顺序，默认 ['fundamental', 'news', 'sentiment', 'bullish', 'bearish', 'summary']
+            files: 报告类型 -> 文件路径，为None时查找 reports/ 中最近生成的文件
+                (不区分品种，多个品种并发分析时应传入各自保存的文件)
         
         返回:
             str: 生成的 PDF 文件路径
         """
-        logger.info(f"【PDF 生成】开始查找 {symbol} 的报告文件...")
-        
         # 默认顺序：基本面 -> 新闻 -> 情绪 -> 看涨 -> 看跌 -> 总结
         if order is None:
-            order = ['fundamental', 'news', 'sentiment', 'bullish', 'bearish', 'summary']
+            order = _SECTION_KINDS
         
-        # 查找最新文件
-        files = self.find_latest_files(symbol)
+        if files is None:
+            # 查找最新文件
+            logger.info(f"【PDF 生成】开始查找 {symbol} 的报告文件...")
+            files = self.find_latest_files(symbol)
+        else:
+            logger.info(f"【PDF 生成】使用本次分析保存的 {symbol} 报告文件...")
+            files = {section: files.get(section) for section in _SECTION_KINDS}
         
         # 记录查找结果
         for section, path in files.items():
@@ -281,32 +304,24 @@ class PDFGenerator:
             else:
                 logger.warning(f"  ✗ {section}: 未找到")
         
-        # 构建完整内容
-        full_content = ""
-        
-        section_titles = {
-            'fundamental': '一、基本面技术分析报告',
-            'news': '二、新闻分析报告',
-            'sentiment': '三、市场情绪分析报告',
-            'bullish': '四、看涨分析报告（多头视角）',
-            'bearish': '五、看跌分析报告（空头视角）',
-            'summary': '六、综合投资报告'
-        }
+        # 构建完整内容 (各片段先放入列表，最后一次性拼接)
+        parts = []
         
         for section in order:
             file_path = files.get(section)
             
             # 添加章节标题
-            full_content += f"\n\n{'='*60}\n"
-            full_content += f"【{section_titles.get(section, section)}】\n"
-            full_content += f"{'='*60}\n\n"
+            parts.append(f"\n\n{'='*60}\n")
+            parts.append(f"【{_SECTION_TITLES.get(section, section)}】\n")
+            parts.append(f"{'='*60}\n\n")
             
             if file_path and os.path.exists(file_path):
                 md_content = self.read_markdown_file(file_path)
-                text_content = self.md_to_text(md_content)
-                full_content += text_content
+                parts.append(self.md_to_text(md_content))
             else:
-                full_content += f"\n[该部分报告未生成或文件未找到]\n"
+                parts.append("\n[该部分报告未生成或文件未找到]\n")
+        
+        full_content = "".join(parts)
         
         # 生成输出文件名
         if output_filename is None:
@@ -322,18 +337,19 @@ class PDFGenerator:
         return output_path
 
 
-def generate_pdf_report(symbol: str) -> str:
+def generate_pdf_report(symbol: str, files: Optional[Dict[str, str]] = None) -> str:
     """
     便捷函数：生成 PDF 报告
     
     参数:
         symbol: 期货品种代码
+        files: 报告类型 -> 文件路径，默认使用最近生成的报告文件
     
     返回:
         str: 生成的 PDF 文件路径
     """
     generator = PDFGenerator()
-    return generator.merge_reports_to_pdf(symbol)
+    return generator.merge_reports_to_pdf(symbol, files=files)
 
 
 if __name__ == "__main__":
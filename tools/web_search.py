@@ -1,9 +1,21 @@
 """
 网络搜索工具 - 基于智谱AI
 """
+import asyncio
 import os
-from typing import Optional
-from langchain_core.tools import tool
+import random
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import httpx
+import orjson
+from langchain_core.tools import StructuredTool
 
 try:
     from zhipuai import ZhipuAI
@@ -11,22 +23,174 @@ try:
 except ImportError:
     HAS_ZHIPUAI = False
 
+# 安装 h2 后异步客户端启用 HTTP/2，并发请求复用同一个连接
+try:
+    import h2  # noqa: F401
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+# 首次读到的 ZHIPU_API_KEY (.env 在本模块导入之后才加载，因此不在导入时读取)
+_api_key: Optional[str] = None
+
+
+def _get_api_key() -> Optional[str]:
+    """获取 ZHIPU_API_KEY，读到后不再重复查询环境变量"""
+    global _api_key
+    if _api_key is None:
+        _api_key = os.getenv("ZHIPU_API_KEY") or None
+    return _api_key
+
 
-@tool
-def web_search(query: str, count: int = 10) -> str:
+def refresh_api_key() -> Optional[str]:
     """
-    互联网搜索，用于获取期货相关新闻资讯
-    
-    参数:
-        query (str): 搜索关键词，如"不锈钢期货 新闻"
-        count (int): 返回结果数量，默认10条
+    重新读取 ZHIPU_API_KEY，环境变量变更后调用
     
     返回:
-        str: 搜索结果，包含标题、链接和摘要
+        Optional[str]: 新的API Key，未设置时为 None
     """
-    # 检查是否安装了zhipuai
-    if not HAS_ZHIPUAI:
-        return f"""【模拟搜索结果】关键词: {query}
+    global _api_key
+    _api_key = None
+    return _get_api_key()
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str) -> "ZhipuAI":
+    """
+    按API Key复用ZhipuAI客户端
+    
+    客户端内部持有HTTP连接池，复用后新闻与情绪Agent的多次搜索可共享已建立的连接
+    """
+    return ZhipuAI(api_key=api_key)
+
+
+# 智谱AI接口地址、搜索引擎及直接搜索失败时回退使用的模型
+_API_BASE = "https://open.bigmodel.cn/api/paas/v4"
+_SEARCH_ENGINE = "search_std"
+_SEARCH_MODEL = "glm-4-flash"
+
+# 异步客户端的连接池与超时设置
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(30, connect=5)
+
+# 每个事件循环各自复用一个异步客户端 (httpx 连接池不能跨事件循环使用)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """获取当前事件循环对应的异步HTTP客户端"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=_API_BASE,
+            http2=HAS_H2,
+            limits=_HTTP_LIMITS,
+            timeout=_HTTP_TIMEOUT,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+class _RateLimiter:
+    """
+    令牌桶限流器，平均每秒最多 rate 个请求，空闲后允许 burst 个请求突发
+    
+    只在锁内计算本次请求的放行时刻，等待在锁外进行，因此同步线程和任意事件循环可以共用
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self._interval = 1.0 / rate
+        self._burst = burst
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """预约一个请求名额，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now - (self._burst - 1) * self._interval)
+            self._next_slot = slot + self._interval
+            return slot - now
+    
+    def wait(self):
+        """同步等待放行"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire(self):
+        """异步等待放行"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# 智谱AI接口限流及重试设置
+_limiter = _RateLimiter(rate=5, burst=5)
+_RETRY_STATUS = {429, 500, 502, 503}
+_MAX_RETRIES = 3
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """重试前的等待时间，优先使用 Retry-After，否则指数退避加随机抖动"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), 30.0)
+        except ValueError:
+            pass
+    return min(2 ** attempt + random.random(), 30.0)
+
+
+async def _post(path: str, payload: dict, api_key: str) -> dict:
+    """经限流发送请求，遇到限流或服务端错误时退避重试，返回解析后的JSON"""
+    client = _get_async_client()
+    for attempt in range(_MAX_RETRIES + 1):
+        await _limiter.acquire()
+        response = await client.post(
+            path,
+            content=orjson.dumps(payload),
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        )
+        if response.status_code not in _RETRY_STATUS or attempt == _MAX_RETRIES:
+            break
+        await asyncio.sleep(_retry_delay(response, attempt))
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+def _search_payload(query: str, count: int) -> dict:
+    """构造直接搜索接口的请求参数"""
+    return {
+        "search_engine": _SEARCH_ENGINE,
+        "search_query": query,
+        "count": count,
+    }
+
+
+def _chat_payload(query: str) -> dict:
+    """构造带 web_search 工具的对话请求参数"""
+    return {
+        "model": _SEARCH_MODEL,
+        "messages": [
+            {"role": "user", "content": f"请搜索以下内容的最新资讯：{query}"}
+        ],
+        "tools": [
+            {
+                "type": "web_search",
+                "web_search": {
+                    "enable": True,
+                    "search_query": query
+                }
+            }
+        ],
+    }
+
+
+# 未安装zhipuai时返回的模拟数据
+_MOCK_TEMPLATE = """【模拟搜索结果】关键词: {query}
 
 由于未安装zhipuai包，返回模拟数据。实际使用时请安装: pip install zhipuai
 
@@ -39,46 +203,249 @@ def web_search(query: str, count: int = 10) -> str:
 3. 原材料成本支撑
    镍价走势坚挺，为不锈钢价格提供成本支撑，限制了价格下跌空间。
 """
+_NO_API_KEY = "错误：未设置ZHIPU_API_KEY环境变量"
+_EMPTY_QUERY = "错误：查询为空"
+
+# 接口支持的结果数量及关键词长度上限
+_MAX_COUNT = 50
+_MAX_QUERY_LEN = 500
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]+")
+
+
+def _normalize_args(query: str, count: int) -> tuple:
+    """清理关键词中的控制字符并截断，将结果数量限制在接口支持的范围内"""
+    query = _CONTROL_CHARS.sub(" ", query or "").strip()[:_MAX_QUERY_LEN]
+    return query, max(1, min(count, _MAX_COUNT))
+
+
+# 搜索结果缓存: 同一关键词在有效期内直接返回上次结果
+_CACHE_TTL = 300  # 秒
+_CACHE_SIZE = 512
+_NOT_FOUND = "未找到相关搜索结果"
+
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _cache_key(query: str, count: int) -> tuple:
+    """缓存键，忽略关键词首尾空白和大小写"""
+    return (query.strip().lower(), count)
+
+
+def _cache_get(key: tuple) -> Optional[str]:
+    """取未过期的缓存结果"""
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return result
+
+
+def _cache_put(key: tuple, result: str):
+    """缓存搜索结果，超出容量时淘汰最久未使用的条目"""
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic() + _CACHE_TTL, result)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > _CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+def _format_hits(hits: Iterable[tuple]) -> str:
+    """将 (标题, 链接, 摘要) 形式的搜索结果格式化为编号列表"""
+    result = "\n\n".join(
+        f"{i + 1}. {title}\n   {link}\n   {content}"
+        for i, (title, link, content) in enumerate(hits)
+    )
+    return result or _NOT_FOUND
+
+
+def _join_contents(contents: Sequence[Optional[str]]) -> str:
+    """合并各候选回复的文本内容，常见的单候选情况直接返回"""
+    if len(contents) == 1:
+        return contents[0] or _NOT_FOUND
+    return "\n\n".join(content for content in contents if content) or _NOT_FOUND
+
+
+def _web_search(query: str, count: int = 10) -> str:
+    """
+    互联网搜索，用于获取期货相关新闻资讯
+    
+    参数:
+        query (str): 搜索关键词，如"不锈钢期货 新闻"
+        count (int): 返回结果数量，默认10条
+    
+    返回:
+        str: 搜索结果，包含标题、链接和摘要
+    """
+    # 本地即可判断的无效参数不发起请求
+    query, count = _normalize_args(query, count)
+    if not query:
+        return _EMPTY_QUERY
+    
+    # 检查是否安装了zhipuai
+    if not HAS_ZHIPUAI:
+        return _MOCK_TEMPLATE.format(query=query)
+    
+    key = _cache_key(query, count)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
     
     try:
-        api_key = os.getenv("ZHIPU_API_KEY")
+        api_key = _get_api_key()
         if not api_key:
-            return "错误：未设置ZHIPU_API_KEY环境变量"
+            return _NO_API_KEY
         
-        client = ZhipuAI(api_key=api_key)
+        client = _get_client(api_key)
         
-        # 使用智谱AI的web_search工具
-        response = client.chat.completions.create(
-            model="glm-4-flash",
-            messages=[
-                {"role": "user", "content": f"请搜索以下内容的最新资讯：{query}"}
-            ],
-            tools=[
-                {
-                    "type": "web_search",
-                    "web_search": {
-                        "enable": True,
-                        "search_query": query
-                    }
-                }
-            ]
-        )
+        # 优先使用智谱AI的直接搜索接口 (SDK 自带429/5xx重试)，出错时回退到带web_search工具的对话接口
+        _limiter.wait()
+        try:
+            response = client.web_search.web_search(**_search_payload(query, count))
+            result = _format_hits(
+                (hit.title, hit.link, hit.content) for hit in response.search_result or []
+            )
+        except Exception:
+            _limiter.wait()
+            response = client.chat.completions.create(**_chat_payload(query))
+            result = _join_contents(
+                [getattr(choice.message, 'content', None) for choice in response.choices]
+            )
         
-        # 提取搜索结果
-        results = []
-        for choice in response.choices:
-            if hasattr(choice.message, 'content') and choice.message.content:
-                results.append(choice.message.content)
-        
-        if results:
-            return "\n\n".join(results)
-        else:
-            return "未找到相关搜索结果"
+        # 只缓存有内容的结果
+        if result != _NOT_FOUND:
+            _cache_put(key, result)
+        return result
             
     except Exception as e:
         return f"搜索出错：{str(e)}"
 
 
+# 正在进行的异步搜索，相同关键词的并发调用等待同一个任务 (Task 属于各自的事件循环)
+_inflight: "Dict[tuple, asyncio.Task]" = {}
+
+
+async def _aweb_search(query: str, count: int = 10) -> str:
+    """web_search 的异步实现，直接通过 httpx 调用接口，不占用线程池"""
+    query, count = _normalize_args(query, count)
+    if not query:
+        return _EMPTY_QUERY
+    
+    if not HAS_ZHIPUAI:
+        return _web_search(query, count)
+    
+    key = _cache_key(query, count)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    # 请求在独立任务中执行，每个调用方都通过 shield 等待，任一调用方被取消不影响其他调用方
+    loop = asyncio.get_running_loop()
+    flight_key = (loop, key)
+    task = _inflight.get(flight_key)
+    if task is None:
+        task = loop.create_task(_afetch(query, count, key))
+        _inflight[flight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(flight_key, None))
+    return await asyncio.shield(task)
+
+
+async def _afetch(query: str, count: int, key: tuple) -> str:
+    """请求智谱AI接口并缓存有内容的结果"""
+    try:
+        api_key = _get_api_key()
+        if not api_key:
+            return _NO_API_KEY
+        
+        try:
+            data = await _post("/web_search", _search_payload(query, count), api_key)
+            result = _format_hits(
+                (hit.get("title"), hit.get("link"), hit.get("content"))
+                for hit in data.get("search_result") or []
+            )
+        except Exception:
+            data = await _post("/chat/completions", _chat_payload(query), api_key)
+            result = _join_contents([
+                (choice.get("message") or {}).get("content")
+                for choice in data.get("choices", [])
+            ])
+        
+        if result != _NOT_FOUND:
+            _cache_put(key, result)
+        return result
+    
+    except Exception as e:
+        return f"搜索出错：{str(e)}"
+
+
+# 同时提供同步与异步实现，Agent 通过 ainvoke 调用时直接走协程
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search",
+)
+
+
+# 批量搜索时同时进行的最大请求数
+_BATCH_CONCURRENCY = 8
+
+
+def _format_batch(queries: List[str], results: Iterable) -> str:
+    """按关键词分段拼接批量搜索结果"""
+    sections = []
+    for query, result in zip(queries, results):
+        if isinstance(result, BaseException):
+            result = f"搜索出错：{str(result)}"
+        sections.append(f"# {query}\n{result}")
+    return "\n\n".join(sections)
+
+
+def _web_search_batch(queries: List[str], count: int = 10) -> str:
+    """
+    批量互联网搜索，同时搜索多个相关关键词，用于一次获取多方面的期货资讯
+    
+    参数:
+        queries (List[str]): 搜索关键词列表，如["不锈钢 库存", "镍 价格", "制造业 PMI"]
+        count (int): 每个关键词返回结果数量，默认10条
+    
+    返回:
+        str: 按关键词分段的搜索结果
+    """
+    if not queries:
+        return "错误：未提供搜索关键词"
+    
+    with ThreadPoolExecutor(max_workers=min(_BATCH_CONCURRENCY, len(queries))) as pool:
+        results = list(pool.map(lambda query: _web_search(query, count), queries))
+    return _format_batch(queries, results)
+
+
+async def _aweb_search_batch(queries: List[str], count: int = 10) -> str:
+    """web_search_batch 的异步实现，并发请求并限制同时进行的数量"""
+    if not queries:
+        return "错误：未提供搜索关键词"
+    
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+    
+    async def search_one(query: str) -> str:
+        async with semaphore:
+            return await _aweb_search(query, count)
+    
+    results = await asyncio.gather(*(search_one(query) for query in queries), return_exceptions=True)
+    return _format_batch(queries, results)
+
+
+web_search_batch = StructuredTool.from_function(
+    func=_web_search_batch,
+    coroutine=_aweb_search_batch,
+    name="web_search_batch",
+)
+
+
 if __name__ == "__main__":
     # 测试
     result = web_search.invoke({"query": "不锈钢期货 最新行情", "count": 5})
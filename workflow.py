@@ -7,21 +7,29 @@
    - 情绪分析Agent (sentiment_agent)
    - 基本面分析Agent (fundamental_agent)
    
-2. 第二阶段 - 两个观点分析师并行执行:
+2. 第二阶段 - 两个观点分析师在同一节点内并行执行 (views_agent):
    - 看涨分析师 (bullish_agent)
    - 看跌分析师 (bearish_agent)
    
 3. 第三阶段 - 汇总Agent整合所有结果 (summary_agent)
 
-使用LangGraph的Send机制实现并行执行
+第一阶段使用LangGraph的Send机制并行执行，第二阶段在节点内通过 asyncio.gather 并行
 """
 from langgraph.types import Command
 import os
-from typing import TypedDict, Annotated, List, Dict, Any
-from datetime import datetime
+import asyncio
+from typing import TypedDict, Annotated, List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+import copy
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
 import operator
 import logging
-from dotenv import load_dotenv
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
 
 from langgraph.graph import StateGraph, END
 from langgraph.types import Send
@@ -31,18 +39,43 @@ from agents import (
     create_news_agent, create_sentiment_agent, create_fundamental_agent,
     create_bullish_agent, create_bearish_agent, create_summary_agent
 )
+from agents._env import ensure_env
+from agents._llm_cache import get_llm_cache, llm_cache_enabled, refresh_llm_cache
+from agents._model import get_default_model
+from tools.futures_analyzer import FuturesAnalyzer, clear_data_cache
+
+try:
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    HAS_SQLITE_SAVER = True
+except ImportError:
+    HAS_SQLITE_SAVER = False
 
 # 加载环境变量
-load_dotenv()
+ensure_env()
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# 配置日志: 节点只把日志记录放入队列，由后台线程格式化并写入 stderr，避免阻塞事件循环
+if not logging.root.handlers:
+    _log_queue = queue.SimpleQueue()
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    _queue_handler = QueueHandler(_log_queue)
+    _queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+    _log_listener = QueueListener(_log_queue, _log_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# 日志分隔线
+SEP = "=" * 80
+DASH = "-" * 80
+
+# 检查点数据库路径，用于同一品种重复运行时跳过已完成的节点
+CHECKPOINT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports", ".checkpoints.db")
+
 
 # ============== 状态定义 ==============
 class FuturesAnalysisState(TypedDict):
@@ -51,35 +84,180 @@ class FuturesAnalysisState(TypedDict):
     symbol: str  # 期货品种代码，如 "ss"
     keyword: str  # 搜索关键词，如 "不锈钢"
     
-    # 第一阶段 - 基础分析Agent的输出结果
-    news_result: Annotated[List[Dict], operator.add]  # 新闻分析结果
-    sentiment_result: Annotated[List[Dict], operator.add]  # 情绪分析结果
-    fundamental_result: Annotated[List[Dict], operator.add]  # 基本面分析结果
+    # 第一阶段 - 基础分析Agent的输出结果 (每个字段只由一个节点写入，成功写内容，失败写错误信息)
+    news_content: str  # 新闻分析结果
+    news_error: Optional[str]
+    sentiment_content: str  # 情绪分析结果
+    sentiment_error: Optional[str]
+    fundamental_content: str  # 基本面分析结果
+    fundamental_error: Optional[str]
     
     # 第二阶段 - 观点分析师的输出结果
-    bullish_result: Annotated[List[Dict], operator.add]  # 看涨分析报告
-    bearish_result: Annotated[List[Dict], operator.add]  # 看跌分析报告
+    bullish_content: str  # 看涨分析报告
+    bullish_error: Optional[str]
+    bearish_content: str  # 看跌分析报告
+    bearish_error: Optional[str]
     
     # 中间状态
     errors: Annotated[List[str], operator.add]  # 错误信息
-    first_phase_ready: bool  # 第一阶段是否完成
-    second_phase_ready: bool  # 第二阶段是否完成
+    report_files: Annotated[Dict[str, str], operator.or_]  # 本次运行各Agent保存的报告文件，报告类型 -> 路径
     
     # 最终结果
     final_report: str  # 汇总报告
     report_path: str  # 报告保存路径
 
 
-# ============== 初始化模型和Agents ==============
-def get_model():
-    """获取LLM模型实例"""
-    return ChatDeepSeek(
-        model="deepseek-chat",
-        temperature=0,
-        api_key=os.getenv("DEEPSEEK_API_KEY")
+# ============== 提示词模板 ==============
+# 第一阶段三份报告，看涨、看跌与汇总提示词共用
+_PHASE1_REPORTS = """===================
+【新闻分析报告】
+===================
+{news_content}
+
+===================
+【情绪分析报告】
+===================
+{sentiment_content}
+
+===================
+【基本面技术分析报告】
+===================
+{fundamental_content}
+"""
+
+BULLISH_PROMPT_TMPL = """请基于以下{keyword}({symbol})期货的分析报告，给出专业的看涨分析：
+
+""" + _PHASE1_REPORTS + """
+请从多头视角深度挖掘投资机会，给出具体的做多策略建议，并保存分析报告。
+"""
+
+BEARISH_PROMPT_TMPL = """请基于以下{keyword}({symbol})期货的分析报告，给出专业的看跌分析：
+
+""" + _PHASE1_REPORTS + """
+请从空头视角深度挖掘风险因素，给出具体的做空/避险策略建议，并保存分析报告。
+"""
+
+SUMMARY_PROMPT_TMPL = """请基于以下五个分析报告生成综合投资报告：
+
+分析品种: {keyword} ({symbol})
+
+""" + _PHASE1_REPORTS + """
+===================
+【看涨分析报告（多头视角）】
+===================
+{bullish_content}
+
+===================
+【看跌分析报告（空头视角）】
+===================
+{bearish_content}
+
+请整合以上所有信息，特别关注看涨和看跌分析师的对立观点，形成平衡的投资判断，生成一份完整的综合投资报告，并保存到文件。
+"""
+
+
+# 基础分析至少成功这么多项才调用汇总Agent，否则直接返回说明
+_PHASE1_AGENTS = {"news": "新闻", "sentiment": "情绪", "fundamental": "基本面"}
+_MIN_PHASE1_SUCCESS = 2
+
+SUMMARY_SKIPPED_TMPL = """汇总报告未生成: {keyword}({symbol}) 的基础分析仅完成 {done}/{total} 项，不足以形成可靠的综合判断。
+
+未完成的分析:
+{reasons}
+"""
+
+
+def _prompt_args(
+    state: FuturesAnalysisState,
+    news_content: str,
+    sentiment_content: str,
+    fundamental_content: str,
+    bullish_content: str = "",
+    bearish_content: str = "",
+) -> Dict[str, str]:
+    """提示词模板的填充参数，缺失的报告以"未能完成"说明代替"""
+    return {
+        "keyword": state['keyword'],
+        "symbol": state['symbol'],
+        "news_content": news_content or "新闻分析未能完成",
+        "sentiment_content": sentiment_content or "情绪分析未能完成",
+        "fundamental_content": fundamental_content or "基本面分析未能完成",
+        "bullish_content": bullish_content or "看涨分析未能完成",
+        "bearish_content": bearish_content or "看跌分析未能完成",
+    }
+
+
+def _phase1_prompt_args(state: FuturesAnalysisState) -> Dict[str, str]:
+    """看涨、看跌提示词的填充参数，只包含第一阶段成功输出的内容"""
+    return _prompt_args(
+        state,
+        _get_agent_content(state, "news"),
+        _get_agent_content(state, "sentiment"),
+        _get_agent_content(state, "fundamental"),
     )
 
 
+# ============== 初始化模型和Agents ==============
+def get_model() -> ChatDeepSeek:
+    """
+    获取LLM模型实例
+    
+    同一次执行 (同一事件循环) 中各节点共享一个实例，复用其HTTP连接池，按模型缓存的Agent也只需编译一次
+    """
+    return get_default_model()
+
+
+# ============== 结果提取 ==============
+def _log_preview(title: str, content: str, limit: int = None):
+    """以DEBUG级别输出内容预览，未开启DEBUG时不做切片和格式化"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug(title)
+    logger.debug(DASH)
+    logger.debug(content if limit is None else content[:limit])
+    if limit is not None and len(content) > limit:
+        logger.debug(f"... (内容已截断，完整内容共 {len(content)} 字符)")
+    logger.debug(DASH)
+
+
+def _message_text(result: Dict[str, Any]) -> str:
+    """拼接Agent返回的所有消息文本，每条消息后换行"""
+    parts = [msg.content for msg in result["messages"] if getattr(msg, "content", None)]
+    return "\n".join(parts) + "\n" if parts else ""
+
+
+def _report_file(result: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """
+    取Agent本次通过 save_{kind}_to_markdown 保存的文件路径，作为 report_files 的状态更新
+    
+    多个品种并发分析时，PDF 只合并各自运行保存的文件，未保存时返回空更新
+    """
+    tool_name = f"save_{kind}_to_markdown"
+    for msg in reversed(result["messages"]):
+        if getattr(msg, "name", None) == tool_name and getattr(msg, "artifact", None):
+            return {"report_files": {kind: msg.artifact}}
+    return {}
+
+
+def _get_agent_content(state: FuturesAnalysisState, name: str) -> str:
+    """取某个Agent成功输出的内容，失败或未执行时返回空字符串"""
+    return state.get(f"{name}_content") or ""
+
+
+def _collect_for_summary(state: FuturesAnalysisState, name: str, label: str) -> str:
+    """为汇总节点取某个Agent的结果并记录日志，失败时以错误说明代替内容"""
+    error = state.get(f"{name}_error")
+    if error is not None:
+        logger.warning(f"  ✗ {label}分析失败: {error}")
+        return f"{label}分析出错: {error}"
+    content = state.get(f"{name}_content")
+    if content is None:
+        logger.warning(f"  ✗ {label}分析结果为空")
+        return ""
+    logger.info(f"  ✓ {label}分析结果: {len(content)} 字符")
+    return content
+
+
 # ============== 节点函数 ==============
 def start_analysis(state: FuturesAnalysisState):
     """
@@ -87,28 +265,28 @@ def start_analysis(state: FuturesAnalysisState):
     
     这个节点是工作流的入口，负责准备初始状态
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤1】开始分析节点 (start_analysis)")
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info(f"期货品种代码: {state['symbol']}")
     logger.info(f"搜索关键词: {state['keyword']}")
-    logger.info(f"当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("="*80)
+    logger.info(f"当前时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(SEP)
     
     # 返回空更新，只是触发并行分支
     return {}
 
 
-def analyze_news(state: FuturesAnalysisState):
+async def analyze_news(state: FuturesAnalysisState):
     """
     新闻搜集Agent节点
     
     搜集并分析期货相关新闻
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤2.1】新闻搜集Agent节点 (analyze_news)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         logger.debug("正在初始化模型...")
@@ -123,56 +301,49 @@ def analyze_news(state: FuturesAnalysisState):
         query = f"分析{state['keyword']}期货市场的新闻资讯"
         logger.info("【Agent输入】")
         logger.info(f"查询内容: {query}")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行分析...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", query)]
         })
         logger.info("Agent调用完成")
         
         # 提取Agent的输出内容
-        content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                content += msg.content + "\n"
+        content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"输出长度: {len(content)} 字符")
-        logger.info("输出内容预览:")
-        logger.info("-"*80)
-        logger.info(content[:500])
-        if len(content) > 500:
-            logger.info(f"... (内容已截断，完整内容共 {len(content)} 字符)")
-        logger.info("-"*80)
+        _log_preview("输出内容预览:", content, limit=500)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "news_result": [{"status": "success", "content": content}]
+            "news_content": content,
+            **_report_file(result, "news")
         }
         
     except Exception as e:
         logger.error("【错误】新闻Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
-            "news_result": [{"status": "error", "error": str(e)}],
+            "news_error": str(e),
             "errors": [f"新闻分析出错: {e}"]
         }
 
 
-def analyze_sentiment(state: FuturesAnalysisState):
+async def analyze_sentiment(state: FuturesAnalysisState):
     """
     情绪分析Agent节点
     
     分析市场情绪
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤2.2】情绪分析Agent节点 (analyze_sentiment)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         logger.debug("正在初始化模型...")
@@ -187,56 +358,49 @@ def analyze_sentiment(state: FuturesAnalysisState):
         query = f"请分析{state['keyword']}期货市场的整体情绪。考虑当前市场环境、投资者心态、资金流向等因素。"
         logger.info("【Agent输入】")
         logger.info(f"查询内容: {query}")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行分析...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", query)]
         })
         logger.info("Agent调用完成")
         
         # 提取Agent的输出内容
-        content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                content += msg.content + "\n"
+        content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"输出长度: {len(content)} 字符")
-        logger.info("输出内容预览:")
-        logger.info("-"*80)
-        logger.info(content[:500])
-        if len(content) > 500:
-            logger.info(f"... (内容已截断，完整内容共 {len(content)} 字符)")
-        logger.info("-"*80)
+        _log_preview("输出内容预览:", content, limit=500)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "sentiment_result": [{"status": "success", "content": content}]
+            "sentiment_content": content,
+            **_report_file(result, "sentiment")
         }
         
     except Exception as e:
         logger.error("【错误】情绪Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
-            "sentiment_result": [{"status": "error", "error": str(e)}],
+            "sentiment_error": str(e),
             "errors": [f"情绪分析出错: {e}"]
         }
 
 
-def analyze_fundamental(state: FuturesAnalysisState):
+async def analyze_fundamental(state: FuturesAnalysisState):
     """
     基本面分析Agent节点
     
     分析期货品种的技术面和基本面数据
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤2.3】基本面分析Agent节点 (analyze_fundamental)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         logger.debug("正在初始化模型...")
@@ -251,56 +415,49 @@ def analyze_fundamental(state: FuturesAnalysisState):
         query = f"请分析{state['keyword']}({state['symbol']})期货的技术面数据，包括价格走势、成交量、持仓量、技术指标等。"
         logger.info("【Agent输入】")
         logger.info(f"查询内容: {query}")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行分析...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", query)]
         })
         logger.info("Agent调用完成")
         
         # 提取Agent的输出内容
-        content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                content += msg.content + "\n"
+        content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"输出长度: {len(content)} 字符")
-        logger.info("输出内容预览:")
-        logger.info("-"*80)
-        logger.info(content[:500])
-        if len(content) > 500:
-            logger.info(f"... (内容已截断，完整内容共 {len(content)} 字符)")
-        logger.info("-"*80)
+        _log_preview("输出内容预览:", content, limit=500)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "fundamental_result": [{"status": "success", "content": content}]
+            "fundamental_content": content,
+            **_report_file(result, "fundamental")
         }
         
     except Exception as e:
         logger.error("【错误】基本面Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
-            "fundamental_result": [{"status": "error", "error": str(e)}],
+            "fundamental_error": str(e),
             "errors": [f"基本面分析出错: {e}"]
         }
 
 
-def analyze_bullish(state: FuturesAnalysisState):
+async def analyze_bullish(state: FuturesAnalysisState, prompt_args: Dict[str, str] = None):
     """
     看涨分析师Agent节点
     
     基于第一阶段分析结果，挖掘看涨逻辑和做多机会
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤2.4】看涨分析师Agent节点 (analyze_bullish)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         logger.debug("正在初始化模型...")
@@ -311,97 +468,57 @@ def analyze_bullish(state: FuturesAnalysisState):
         agent = create_bullish_agent(model)
         logger.info("Agent创建成功")
         
-        # 提取第一阶段的结果
-        news_content = ""
-        if state.get("news_result") and len(state["news_result"]) > 0:
-            news_data = state["news_result"][0]
-            if news_data.get("status") == "success":
-                news_content = news_data.get("content", "")
-        
-        sentiment_content = ""
-        if state.get("sentiment_result") and len(state["sentiment_result"]) > 0:
-            sentiment_data = state["sentiment_result"][0]
-            if sentiment_data.get("status") == "success":
-                sentiment_content = sentiment_data.get("content", "")
-        
-        fundamental_content = ""
-        if state.get("fundamental_result") and len(state["fundamental_result"]) > 0:
-            fundamental_data = state["fundamental_result"][0]
-            if fundamental_data.get("status") == "success":
-                fundamental_content = fundamental_data.get("content", "")
+        # 提取第一阶段的结果 (由观点分析节点调用时已提取好)
+        if prompt_args is None:
+            prompt_args = _phase1_prompt_args(state)
         
         # 构建查询
-        query = f"""请基于以下{state['keyword']}({state['symbol']})期货的分析报告，给出专业的看涨分析：
-
-===================
-【新闻分析报告】
-===================
-{news_content if news_content else "新闻分析未能完成"}
-
-===================
-【情绪分析报告】
-===================
-{sentiment_content if sentiment_content else "情绪分析未能完成"}
-
-===================
-【基本面技术分析报告】
-===================
-{fundamental_content if fundamental_content else "基本面分析未能完成"}
-
-请从多头视角深度挖掘投资机会，给出具体的做多策略建议，并保存分析报告。
-"""
+        query = BULLISH_PROMPT_TMPL.format_map(prompt_args)
         logger.info("【Agent输入】")
         logger.info(f"查询内容长度: {len(query)} 字符")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行分析...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", query)]
         })
         logger.info("Agent调用完成")
         
         # 提取Agent的输出内容
-        content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                content += msg.content + "\n"
+        content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"输出长度: {len(content)} 字符")
-        logger.info("输出内容预览:")
-        logger.info("-"*80)
-        logger.info(content[:500])
-        if len(content) > 500:
-            logger.info(f"... (内容已截断，完整内容共 {len(content)} 字符)")
-        logger.info("-"*80)
+        _log_preview("输出内容预览:", content, limit=500)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "bullish_result": [{"status": "success", "content": content}]
+            "bullish_content": content,
+            **_report_file(result, "bullish")
         }
         
     except Exception as e:
         logger.error("【错误】看涨分析师Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
-            "bullish_result": [{"status": "error", "error": str(e)}],
+            "bullish_error": str(e),
             "errors": [f"看涨分析出错: {e}"]
         }
 
 
-def analyze_bearish(state: FuturesAnalysisState):
+async def analyze_bearish(state: FuturesAnalysisState, prompt_args: Dict[str, str] = None):
     """
     看跌分析师Agent节点
     
     基于第一阶段分析结果，挖掘看跌逻辑和风险警示
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤2.5】看跌分析师Agent节点 (analyze_bearish)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         logger.debug("正在初始化模型...")
@@ -412,97 +529,75 @@ def analyze_bearish(state: FuturesAnalysisState):
         agent = create_bearish_agent(model)
         logger.info("Agent创建成功")
         
-        # 提取第一阶段的结果
-        news_content = ""
-        if state.get("news_result") and len(state["news_result"]) > 0:
-            news_data = state["news_result"][0]
-            if news_data.get("status") == "success":
-                news_content = news_data.get("content", "")
-        
-        sentiment_content = ""
-        if state.get("sentiment_result") and len(state["sentiment_result"]) > 0:
-            sentiment_data = state["sentiment_result"][0]
-            if sentiment_data.get("status") == "success":
-                sentiment_content = sentiment_data.get("content", "")
-        
-        fundamental_content = ""
-        if state.get("fundamental_result") and len(state["fundamental_result"]) > 0:
-            fundamental_data = state["fundamental_result"][0]
-            if fundamental_data.get("status") == "success":
-                fundamental_content = fundamental_data.get("content", "")
+        # 提取第一阶段的结果 (由观点分析节点调用时已提取好)
+        if prompt_args is None:
+            prompt_args = _phase1_prompt_args(state)
         
         # 构建查询
-        query = f"""请基于以下{state['keyword']}({state['symbol']})期货的分析报告，给出专业的看跌分析：
-
-===================
-【新闻分析报告】
-===================
-{news_content if news_content else "新闻分析未能完成"}
-
-===================
-【情绪分析报告】
-===================
-{sentiment_content if sentiment_content else "情绪分析未能完成"}
-
-===================
-【基本面技术分析报告】
-===================
-{fundamental_content if fundamental_content else "基本面分析未能完成"}
-
-请从空头视角深度挖掘风险因素，给出具体的做空/避险策略建议，并保存分析报告。
-"""
+        query = BEARISH_PROMPT_TMPL.format_map(prompt_args)
         logger.info("【Agent输入】")
         logger.info(f"查询内容长度: {len(query)} 字符")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行分析...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", query)]
         })
         logger.info("Agent调用完成")
         
         # 提取Agent的输出内容
-        content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                content += msg.content + "\n"
+        content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"输出长度: {len(content)} 字符")
-        logger.info("输出内容预览:")
-        logger.info("-"*80)
-        logger.info(content[:500])
-        if len(content) > 500:
-            logger.info(f"... (内容已截断，完整内容共 {len(content)} 字符)")
-        logger.info("-"*80)
+        _log_preview("输出内容预览:", content, limit=500)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "bearish_result": [{"status": "success", "content": content}]
+            "bearish_content": content,
+            **_report_file(result, "bearish")
         }
         
     except Exception as e:
         logger.error("【错误】看跌分析师Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
-            "bearish_result": [{"status": "error", "error": str(e)}],
+            "bearish_error": str(e),
             "errors": [f"看跌分析出错: {e}"]
         }
 
 
-def generate_summary(state: FuturesAnalysisState):
+async def generate_summary(state: FuturesAnalysisState):
     """
     汇总Agent节点
     
     整合所有Agent的分析结果（基础分析 + 观点分析），生成最终报告
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤3】汇总Agent节点 (generate_summary)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
+    
+    # 基础分析大部分失败时汇总没有意义，直接给出说明，不再调用模型
+    phase1_done = sum(state.get(f"{name}_content") is not None for name in _PHASE1_AGENTS)
+    if phase1_done < _MIN_PHASE1_SUCCESS:
+        logger.warning(f"基础分析仅完成 {phase1_done}/{len(_PHASE1_AGENTS)} 项，跳过汇总Agent")
+        logger.info(SEP)
+        reasons = "\n".join(
+            f"- {label}分析: {state.get(f'{name}_error') or '未执行'}"
+            for name, label in _PHASE1_AGENTS.items()
+            if state.get(f"{name}_content") is None
+        )
+        return {
+            "final_report": SUMMARY_SKIPPED_TMPL.format(
+                keyword=state['keyword'], symbol=state['symbol'],
+                done=phase1_done, total=len(_PHASE1_AGENTS), reasons=reasons
+            ),
+            "errors": [f"汇总分析跳过: 基础分析仅完成 {phase1_done}/{len(_PHASE1_AGENTS)} 项"]
+        }
     
     try:
         logger.debug("正在初始化模型...")
@@ -517,101 +612,20 @@ def generate_summary(state: FuturesAnalysisState):
         logger.info("正在收集所有Agent的分析结果...")
         logger.info("【第一阶段 - 基础分析】")
         
-        news_content = ""
-        if state.get("news_result") and len(state["news_result"]) > 0:
-            news_data = state["news_result"][0]
-            if news_data.get("status") == "success":
-                news_content = news_data.get("content", "")
-                logger.info(f"  ✓ 新闻分析结果: {len(news_content)} 字符")
-            else:
-                news_content = f"新闻分析出错: {news_data.get('error', '未知错误')}"
-                logger.warning(f"  ✗ 新闻分析失败: {news_data.get('error', '未知错误')}")
-        else:
-            logger.warning("  ✗ 新闻分析结果为空")
-        
-        sentiment_content = ""
-        if state.get("sentiment_result") and len(state["sentiment_result"]) > 0:
-            sentiment_data = state["sentiment_result"][0]
-            if sentiment_data.get("status") == "success":
-                sentiment_content = sentiment_data.get("content", "")
-                logger.info(f"  ✓ 情绪分析结果: {len(sentiment_content)} 字符")
-            else:
-                sentiment_content = f"情绪分析出错: {sentiment_data.get('error', '未知错误')}"
-                logger.warning(f"  ✗ 情绪分析失败: {sentiment_data.get('error', '未知错误')}")
-        else:
-            logger.warning("  ✗ 情绪分析结果为空")
-        
-        fundamental_content = ""
-        if state.get("fundamental_result") and len(state["fundamental_result"]) > 0:
-            fundamental_data = state["fundamental_result"][0]
-            if fundamental_data.get("status") == "success":
-                fundamental_content = fundamental_data.get("content", "")
-                logger.info(f"  ✓ 基本面分析结果: {len(fundamental_content)} 字符")
-            else:
-                fundamental_content = f"基本面分析出错: {fundamental_data.get('error', '未知错误')}"
-                logger.warning(f"  ✗ 基本面分析失败: {fundamental_data.get('error', '未知错误')}")
-        else:
-            logger.warning("  ✗ 基本面分析结果为空")
+        news_content = _collect_for_summary(state, "news", "新闻")
+        sentiment_content = _collect_for_summary(state, "sentiment", "情绪")
+        fundamental_content = _collect_for_summary(state, "fundamental", "基本面")
         
         # 提取第二阶段观点分析师的结果
         logger.info("【第二阶段 - 观点分析】")
         
-        bullish_content = ""
-        if state.get("bullish_result") and len(state["bullish_result"]) > 0:
-            bullish_data = state["bullish_result"][0]
-            if bullish_data.get("status") == "success":
-                bullish_content = bullish_data.get("content", "")
-                logger.info(f"  ✓ 看涨分析结果: {len(bullish_content)} 字符")
-            else:
-                bullish_content = f"看涨分析出错: {bullish_data.get('error', '未知错误')}"
-                logger.warning(f"  ✗ 看涨分析失败: {bullish_data.get('error', '未知错误')}")
-        else:
-            logger.warning("  ✗ 看涨分析结果为空")
-        
-        bearish_content = ""
-        if state.get("bearish_result") and len(state["bearish_result"]) > 0:
-            bearish_data = state["bearish_result"][0]
-            if bearish_data.get("status") == "success":
-                bearish_content = bearish_data.get("content", "")
-                logger.info(f"  ✓ 看跌分析结果: {len(bearish_content)} 字符")
-            else:
-                bearish_content = f"看跌分析出错: {bearish_data.get('error', '未知错误')}"
-                logger.warning(f"  ✗ 看跌分析失败: {bearish_data.get('error', '未知错误')}")
-        else:
-            logger.warning("  ✗ 看跌分析结果为空")
+        bullish_content = _collect_for_summary(state, "bullish", "看涨")
+        bearish_content = _collect_for_summary(state, "bearish", "看跌")
         
         # 构建汇总查询
-        summary_query = f"""请基于以下五个分析报告生成综合投资报告：
-
-分析品种: {state['keyword']} ({state['symbol']})
-
-===================
-【新闻分析报告】
-===================
-{news_content if news_content else "新闻分析未能完成"}
-
-===================
-【情绪分析报告】
-===================
-{sentiment_content if sentiment_content else "情绪分析未能完成"}
-
-===================
-【基本面技术分析报告】
-===================
-{fundamental_content if fundamental_content else "基本面分析未能完成"}
-
-===================
-【看涨分析报告（多头视角）】
-===================
-{bullish_content if bullish_content else "看涨分析未能完成"}
-
-===================
-【看跌分析报告（空头视角）】
-===================
-{bearish_content if bearish_content else "看跌分析未能完成"}
-
-请整合以上所有信息，特别关注看涨和看跌分析师的对立观点，形成平衡的投资判断，生成一份完整的综合投资报告，并保存到文件。
-"""
+        summary_query = SUMMARY_PROMPT_TMPL.format_map(_prompt_args(
+            state, news_content, sentiment_content, fundamental_content, bullish_content, bearish_content
+        ))
         
         logger.info("【Agent输入】")
         logger.info(f"输入内容总长度: {len(summary_query)} 字符")
@@ -620,55 +634,76 @@ def generate_summary(state: FuturesAnalysisState):
         logger.info(f"  - 基本面部分: {len(fundamental_content)} 字符")
         logger.info(f"  - 看涨分析部分: {len(bullish_content)} 字符")
         logger.info(f"  - 看跌分析部分: {len(bearish_content)} 字符")
-        logger.info("-"*80)
+        logger.info(DASH)
         
         logger.debug("正在调用Agent进行汇总...")
-        result = agent.invoke({
+        result = await agent.ainvoke({
             "messages": [("user", summary_query)]
         })
         logger.info("Agent调用完成")
         
         # 提取最终报告内容
-        final_content = ""
-        for msg in result["messages"]:
-            if hasattr(msg, 'content') and msg.content:
-                final_content += msg.content + "\n"
+        final_content = _message_text(result)
         
         logger.info("【Agent输出】")
         logger.info(f"最终报告长度: {len(final_content)} 字符")
-        logger.info("最终报告内容:")
-        logger.info("-"*80)
-        logger.info(final_content)
-        logger.info("-"*80)
+        _log_preview("最终报告内容:", final_content)
         
-        logger.info(f"完成时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"完成时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return {
-            "final_report": final_content
+            "final_report": final_content,
+            **_report_file(result, "summary")
         }
         
     except Exception as e:
         logger.error("【错误】汇总Agent执行失败")
         logger.error(f"错误信息: {e}")
-        logger.info("="*80)
+        logger.info(SEP)
         return {
             "final_report": f"汇总报告生成失败: {e}",
             "errors": [f"汇总分析出错: {e}"]
         }
 
 
+async def analyze_views(state: FuturesAnalysisState):
+    """
+    观点分析节点
+    
+    看涨与看跌分析师使用相同的第一阶段结果且互不依赖，在同一节点内并发执行，
+    两份结果一次性写回状态
+    """
+    logger.info(SEP)
+    logger.info("【工作流分发】第一阶段全部完成，进入第二阶段！")
+    logger.info("目标节点: bullish_agent, bearish_agent")
+    logger.info(SEP)
+    
+    # 两位分析师使用相同的第一阶段报告，只提取一次
+    prompt_args = _phase1_prompt_args(state)
+    bullish, bearish = await asyncio.gather(
+        analyze_bullish(state, prompt_args),
+        analyze_bearish(state, prompt_args),
+    )
+    return {
+        **bullish,
+        **bearish,
+        "errors": bullish.get("errors", []) + bearish.get("errors", []),
+        "report_files": {**bullish.get("report_files", {}), **bearish.get("report_files", {})},
+    }
+
+
 def generate_pdf(state: FuturesAnalysisState):
     """
     PDF 生成节点
     
-    将所有 Markdown 报告合并为 PDF
+    将本次运行各Agent保存的 Markdown 报告合并为 PDF
     顺序：基本面 → 新闻 → 情绪 → 看涨 → 看跌 → 总结
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤5】PDF 生成节点 (generate_pdf)")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"开始时间: {time.strftime('%H:%M:%S')}")
     
     try:
         from tools import generate_pdf_report
@@ -676,12 +711,12 @@ def generate_pdf(state: FuturesAnalysisState):
         symbol = state['symbol']
         logger.info(f"正在生成 {symbol.upper()} 的 PDF 综合报告...")
         
-        pdf_path = generate_pdf_report(symbol)
+        pdf_path = generate_pdf_report(symbol, files=state.get("report_files") or {})
         
-        logger.info("="*80)
+        logger.info(SEP)
         logger.info("【PDF 生成完成】")
         logger.info(f"PDF 文件路径: {pdf_path}")
-        logger.info("="*80)
+        logger.info(SEP)
         
         return {"report_path": pdf_path}
         
@@ -699,50 +734,36 @@ def end_workflow(state: FuturesAnalysisState):
     
     打印完成信息
     """
-    logger.info("="*80)
+    logger.info(SEP)
     logger.info("【步骤4】工作流结束节点 (end_workflow)")
-    logger.info("="*80)
-    logger.info(f"结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(SEP)
+    logger.info(f"结束时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"分析品种: {state['keyword']} ({state['symbol']})")
     
     logger.info("【执行结果统计】")
     
     # 统计各Agent的执行情况
-    news_count = len(state.get("news_result", []))
-    sentiment_count = len(state.get("sentiment_result", []))
-    fundamental_count = len(state.get("fundamental_result", []))
-    bullish_count = len(state.get("bullish_result", []))
-    bearish_count = len(state.get("bearish_result", []))
+    news_content = state.get("news_content")
+    sentiment_content = state.get("sentiment_content")
+    fundamental_content = state.get("fundamental_content")
+    bullish_content = state.get("bullish_content")
+    bearish_content = state.get("bearish_content")
     
     logger.info(f"  第一阶段 - 基础分析:")
-    logger.info(f"    新闻分析结果数: {news_count}")
-    logger.info(f"    情绪分析结果数: {sentiment_count}")
-    logger.info(f"    基本面分析结果数: {fundamental_count}")
+    logger.info(f"    新闻分析输出: {len(news_content or '')} 字符")
+    logger.info(f"    情绪分析输出: {len(sentiment_content or '')} 字符")
+    logger.info(f"    基本面分析输出: {len(fundamental_content or '')} 字符")
     
     logger.info(f"  第二阶段 - 观点分析:")
-    logger.info(f"    看涨分析结果数: {bullish_count}")
-    logger.info(f"    看跌分析结果数: {bearish_count}")
+    logger.info(f"    看涨分析输出: {len(bullish_content or '')} 字符")
+    logger.info(f"    看跌分析输出: {len(bearish_content or '')} 字符")
     
-    # 统计成功和失败的情况
-    news_success = 0
-    if news_count > 0 and state["news_result"][0].get("status") == "success":
-        news_success = 1
-    
-    sentiment_success = 0
-    if sentiment_count > 0 and state["sentiment_result"][0].get("status") == "success":
-        sentiment_success = 1
-    
-    fundamental_success = 0
-    if fundamental_count > 0 and state["fundamental_result"][0].get("status") == "success":
-        fundamental_success = 1
-    
-    bullish_success = 0
-    if bullish_count > 0 and state["bullish_result"][0].get("status") == "success":
-        bullish_success = 1
-    
-    bearish_success = 0
-    if bearish_count > 0 and state["bearish_result"][0].get("status") == "success":
-        bearish_success = 1
+    # 统计成功和失败的情况，成功的节点才会写入内容
+    news_success = int(news_content is not None)
+    sentiment_success = int(sentiment_content is not None)
+    fundamental_success = int(fundamental_content is not None)
+    bullish_success = int(bullish_content is not None)
+    bearish_success = int(bearish_content is not None)
     
     logger.info(f"  成功执行的Agent: {news_success + sentiment_success + fundamental_success + bullish_success + bearish_success}/5")
     logger.info(f"    第一阶段:")
@@ -769,6 +790,11 @@ def end_workflow(state: FuturesAnalysisState):
     else:
         logger.warning("  PDF 报告: 未生成")
     
+    # LLM缓存命中情况 (本进程累计)
+    if llm_cache_enabled():
+        llm_cache = get_llm_cache()
+        logger.info(f"  LLM缓存: 命中 {llm_cache.hits} 次, 未命中 {llm_cache.misses} 次")
+    
     # 错误信息
     if state.get("errors"):
         logger.warning(f"【警告】执行过程中出现 {len(state['errors'])} 个错误:")
@@ -777,29 +803,28 @@ def end_workflow(state: FuturesAnalysisState):
     else:
         logger.info("【状态】执行过程无错误")
     
-    logger.info("="*80)
+    logger.info(SEP)
     
     return {}
 
 
 # ============== 工作流构建 ==============
-def create_workflow():
+@lru_cache(maxsize=1)
+def _build_workflow() -> StateGraph:
     """
-    创建并编译工作流
+    构建工作流状态图 (每个进程只构建一次)
     
     工作流结构（两阶段并行）:
     
     第一阶段:
-    start -> [news_agent, sentiment_agent, fundamental_agent] (并行) -> first_phase_join
+    start -> [news_agent, sentiment_agent, fundamental_agent] (并行)
     
     第二阶段（在第一阶段全部完成后触发）:
-    first_phase_join -> [bullish_agent, bearish_agent] (并行) -> second_phase_join
+    [news_agent, sentiment_agent, fundamental_agent] -> views_agent (看涨、看跌分析师在节点内并行)
     
-    汇总（在第二阶段全部完成后触发）:
-    second_phase_join -> summary_agent -> end
+    汇总:
+    views_agent -> summary_agent -> generate_pdf -> end
     """
-    from langgraph.graph import END
-    
     # 创建状态图
     workflow = StateGraph(FuturesAnalysisState)
     
@@ -808,15 +833,11 @@ def create_workflow():
     workflow.add_node("news_agent", analyze_news)
     workflow.add_node("sentiment_agent", analyze_sentiment)
     workflow.add_node("fundamental_agent", analyze_fundamental)
-    workflow.add_node("bullish_agent", analyze_bullish)
-    workflow.add_node("bearish_agent", analyze_bearish)
+    workflow.add_node("views_agent", analyze_views)
     workflow.add_node("summary_agent", generate_summary)
     workflow.add_node("end", end_workflow)
     workflow.add_node("generate_pdf", generate_pdf)
     
-    # 添加汇聚节点（在边配置部分定义）
-    # first_phase_join 和 second_phase_join 在下面的边配置中通过 add_node 添加
-    
     # 添加边
     # 从start节点分发到三个并行Agent（第一阶段）
     workflow.set_entry_point("start")
@@ -824,12 +845,12 @@ def create_workflow():
     # 使用Send实现第一阶段并行执行
     def dispatch_first_phase(state: FuturesAnalysisState):
         """分发到三个基础分析Agent"""
-        logger.info("="*80)
+        logger.info(SEP)
         logger.info("【工作流分发】第一阶段：并行分发任务到三个基础Agent")
-        logger.info("="*80)
+        logger.info(SEP)
         logger.info("目标节点: news_agent, sentiment_agent, fundamental_agent")
-        logger.info(f"分发时间: {datetime.now().strftime('%H:%M:%S')}")
-        logger.info("="*80)
+        logger.info(f"分发时间: {time.strftime('%H:%M:%S')}")
+        logger.info(SEP)
         
         return [
             Send("news_agent", state),
@@ -843,190 +864,302 @@ def create_workflow():
         ["news_agent", "sentiment_agent", "fundamental_agent"]
     )
     
-    # 汇聚节点 - 只记录日志和更新状态，不进行路由
-    def first_phase_join(state: FuturesAnalysisState):
-        """
-        第一阶段汇聚节点
-        
-        记录三个基础Agent的完成状态
-        """
-        has_news = len(state.get("news_result", [])) > 0
-        has_sentiment = len(state.get("sentiment_result", [])) > 0
-        has_fundamental = len(state.get("fundamental_result", [])) > 0
-        
-        completed = sum([has_news, has_sentiment, has_fundamental])
-        
-        logger.info("="*80)
-        logger.info(f"【第一阶段汇聚】检查完成状态: {completed}/3")
-        logger.info(f"  新闻: {'✓' if has_news else '○'}, 情绪: {'✓' if has_sentiment else '○'}, 基本面: {'✓' if has_fundamental else '○'}")
-        logger.info("="*80)
-        
-        # 返回状态更新，不在这里做路由决策
-        return {"first_phase_ready": has_news and has_sentiment and has_fundamental}
-    
-    # 第一阶段路由函数
-    def route_first_phase(state: FuturesAnalysisState):
-        """路由函数：检查第一阶段是否全部完成"""
-        has_news = len(state.get("news_result", [])) > 0
-        has_sentiment = len(state.get("sentiment_result", [])) > 0
-        has_fundamental = len(state.get("fundamental_result", [])) > 0
-        
-        if has_news and has_sentiment and has_fundamental:
-            logger.info("【路由决策】第一阶段全部完成，分发到第二阶段！")
-            return "dispatch_second"
-        else:
-            logger.info("【路由决策】第一阶段未完成，等待...")
-            return "wait"
-    
-    # 添加汇聚节点到工作流
-    workflow.add_node("first_phase_join", first_phase_join)
-    
-    # 三个Agent完成后都连接到汇聚节点
-    workflow.add_edge("news_agent", "first_phase_join")
-    workflow.add_edge("sentiment_agent", "first_phase_join")
-    workflow.add_edge("fundamental_agent", "first_phase_join")
-    
-    # 汇聚节点通过条件边路由，使用Send直接分发到第二阶段Agent
-    def route_and_dispatch_second(state: FuturesAnalysisState):
-        """路由函数：检查第一阶段是否全部完成，如果完成则分发到第二阶段"""
-        has_news = len(state.get("news_result", [])) > 0
-        has_sentiment = len(state.get("sentiment_result", [])) > 0
-        has_fundamental = len(state.get("fundamental_result", [])) > 0
-        
-        if has_news and has_sentiment and has_fundamental:
-            logger.info("="*80)
-            logger.info("【工作流分发】第一阶段全部完成，分发到第二阶段！")
-            logger.info("="*80)
-            logger.info("目标节点: bullish_agent, bearish_agent")
-            logger.info(f"分发时间: {datetime.now().strftime('%H:%M:%S')}")
-            logger.info("="*80)
-            # 使用Send直接分发到第二阶段Agent
-            return [
-                Send("bullish_agent", state),
-                Send("bearish_agent", state)
-            ]
-        else:
-            logger.info("【路由决策】第一阶段未完成，等待...")
-            return END
+    # 三个基础Agent全部完成后进入第二阶段 (多来源的边会等待所有来源节点完成)
+    workflow.add_edge(["news_agent", "sentiment_agent", "fundamental_agent"], "views_agent")
     
-    workflow.add_conditional_edges(
-        "first_phase_join",
-        route_and_dispatch_second,
-        ["bullish_agent", "bearish_agent", END]
-    )
+    # 两个观点分析师在同一节点内完成，直接进入汇总
+    workflow.add_edge("views_agent", "summary_agent")
     
-    # 第二阶段汇聚逻辑
-    def second_phase_join(state: FuturesAnalysisState):
-        """第二阶段汇聚节点"""
-        has_bullish = len(state.get("bullish_result", [])) > 0
-        has_bearish = len(state.get("bearish_result", [])) > 0
-        
-        completed = sum([has_bullish, has_bearish])
-        
-        logger.info("="*80)
-        logger.info(f"【第二阶段汇聚】检查完成状态: {completed}/2")
-        logger.info(f"  看涨: {'✓' if has_bullish else '○'}, 看跌: {'✓' if has_bearish else '○'}")
-        logger.info("="*80)
-        
-        return {"second_phase_ready": has_bullish and has_bearish}
+    # summary完成后生成PDF，然后结束
+    workflow.add_edge("summary_agent", "generate_pdf")
+    workflow.add_edge("generate_pdf", "end")
     
-    # 第二阶段路由函数
-    def route_second_phase(state: FuturesAnalysisState):
-        """路由函数：检查第二阶段是否全部完成"""
-        has_bullish = len(state.get("bullish_result", [])) > 0
-        has_bearish = len(state.get("bearish_result", [])) > 0
-        
-        if has_bullish and has_bearish:
-            logger.info("【路由决策】第二阶段全部完成，触发汇总！")
-            return "summary"
-        else:
-            logger.info("【路由决策】第二阶段未完成，等待...")
-            return "wait"
+    return workflow
+
+
+@lru_cache(maxsize=1)
+def _compiled_workflow():
+    """不带检查点的已编译工作流，图中不保存单次执行的状态，可在多次调用间共享"""
+    return _build_workflow().compile()
+
+
+def create_workflow(checkpointer=None):
+    """
+    创建并编译工作流
     
-    workflow.add_node("second_phase_join", second_phase_join)
+    参数:
+        checkpointer: LangGraph检查点保存器，为None时不持久化状态
     
-    # 两个观点分析师完成后汇聚
-    workflow.add_edge("bullish_agent", "second_phase_join")
-    workflow.add_edge("bearish_agent", "second_phase_join")
+    返回:
+        编译后的工作流，不使用检查点时每次返回同一个实例
+    """
+    if checkpointer is None:
+        return _compiled_workflow()
+    return _build_workflow().compile(checkpointer=checkpointer)
+
+
+# ============== 便捷函数 ==============
+async def _stream_workflow(app, inputs, config=None, on_progress=None) -> Dict[str, Any]:
+    """
+    流式执行工作流，每个节点完成时回调 on_progress(节点名, 状态更新)
     
-    # 第二阶段汇聚后路由到汇总或结束
-    workflow.add_conditional_edges(
-        "second_phase_join",
-        route_second_phase,
-        {
-            "summary": "summary_agent",
-            "wait": END
-        }
-    )
+    返回:
+        Dict: 工作流最终状态
+    """
+    result = None
+    # 使用检查点时每步同步写入，中断时已完成的观点分析不会因检查点尚未落盘而重跑
+    durability = "sync" if config is not None else None
+    async for mode, chunk in app.astream(inputs, config, stream_mode=["updates", "values"], durability=durability):
+        if mode == "values":
+            result = chunk
+        elif on_progress is not None:
+            for node, update in chunk.items():
+                on_progress(node, update)
+    return result
+
+
+# 初始状态中与品种无关的字段，每次调用时复制 (errors 列表需每次新建)
+_INITIAL_STATE = {
+    "final_report": "",
+    "report_path": ""
+}
+
+
+# analyze_futures 默认返回的字段
+_RESULT_KEYS = ("final_report", "report_path", "errors")
+
+
+def _slim_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留调用方通常需要的报告字段"""
+    return {key: result.get(key) for key in _RESULT_KEYS}
+
+
+def _symbol_to_chinese_name(symbol: str) -> str:
+    """品种代码映射中文名，直接查 FuturesAnalyzer 的类级映射表而不构造分析器，未知品种返回小写代码"""
+    code = symbol.lower()
+    return FuturesAnalyzer.SYMBOL_TO_CHINESE.get(code, code)
+
+
+def _initial_state(symbol: str, keyword: str = None) -> Dict[str, Any]:
+    """记录启动信息并构造工作流初始状态，未提供关键词时使用品种中文名"""
+    keyword_label = "搜索关键词"
+    if keyword is None:
+        keyword = _symbol_to_chinese_name(symbol)
+        keyword_label = "自动映射中文名"
     
-    # summary完成后生成PDF，然后结束
-    workflow.add_edge("summary_agent", "generate_pdf")
-    workflow.add_edge("generate_pdf", "end")
+    # 启动横幅合并为一条日志
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%s\n【期货分析工作流启动】\n%s\n开始时间: %s\n期货品种代码: %s\n%s: %s\n%s",
+            SEP, SEP, time.strftime('%Y-%m-%d %H:%M:%S'), symbol, keyword_label, keyword, SEP
+        )
     
-    # 编译工作流
-    return workflow.compile()
+    return {**_INITIAL_STATE, "symbol": symbol, "keyword": keyword, "errors": []}
 
 
-# ============== 便捷函数 ==============
-def analyze_futures(symbol: str, keyword: str = None) -> Dict[str, Any]:
+# 分析结果的进程内缓存 (与行情分钟线刷新频率相当)
+_RESULT_CACHE_TTL = 900  # 秒
+_RESULT_CACHE_SIZE = 64
+
+_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _result_cache_get(key: tuple) -> Optional[Dict[str, Any]]:
+    """取未过期的分析结果副本 (连同 errors 等可变字段一起复制，调用方修改不影响缓存)"""
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+
+def _result_cache_put(key: tuple, result: Dict[str, Any]):
+    """缓存分析结果，超出容量时淘汰最久未使用的条目"""
+    with _result_cache_lock:
+        _result_cache[key] = (time.monotonic() + _RESULT_CACHE_TTL, copy.deepcopy(result))
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+async def analyze_futures_async(
+    symbol: str,
+    keyword: str = None,
+    thread_id: str = None,
+    on_progress: Callable[[str, Any], None] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
     """
-    分析期货品种的便捷函数
+    异步分析期货品种
+    
+    各Agent节点通过 ainvoke 调用，并行分支的LLM请求在同一事件循环中重叠执行
     
     参数:
         symbol (str): 期货品种代码，如 "ss" (不锈钢)
         keyword (str): 搜索关键词，如 "不锈钢"，默认为symbol
+        thread_id (str): 检查点线程ID，提供时将状态保存到 reports/.checkpoints.db，
+            同一线程已无错误地完成则直接返回保存的结果，中断过则从最后完成的节点继续，
+            上次结果包含错误时重新执行；
+            不提供时，15分钟内同一品种的成功结果在进程内复用
+        on_progress (Callable): 可选回调，每个节点完成时以 (节点名, 状态更新) 调用，
+            复用缓存结果时以 ("result_cache", 结果) 调用一次
+        use_cache (bool): 为False时不复用进程内的分析结果，重新获取当天行情数据，并忽略已缓存的LLM回复
     
     返回:
         Dict: 包含分析结果的字典
     """
-    logger.info("="*80)
-    logger.info("【期货分析工作流启动】")
-    logger.info("="*80)
-    logger.info(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"期货品种代码: {symbol}")
+    started = time.monotonic()
+    initial_state = _initial_state(symbol, keyword)
+    
+    if thread_id is not None and not HAS_SQLITE_SAVER:
+        logger.warning("未安装 langgraph-checkpoint-sqlite，忽略检查点")
+        thread_id = None
+    
+    if not use_cache:
+        # 重新执行时清除当天的行情分析缓存，LLM缓存只写入不读取
+        clear_data_cache(initial_state["symbol"])
+    
+    with refresh_llm_cache(not use_cache):
+        # 不使用检查点时，同一交易日内相同品种和关键词的结果在有效期内直接复用
+        cache_key = (initial_state["symbol"].lower(), initial_state["keyword"], date.today())
+        cached = _result_cache_get(cache_key) if thread_id is None and use_cache else None
+        
+        if cached is not None:
+            logger.info("复用 %d 秒内的分析结果，跳过执行", _RESULT_CACHE_TTL)
+            result = cached
+            # 不经过各节点，以一次进度回调告知调用方结果来自缓存
+            if on_progress is not None:
+                on_progress("result_cache", result)
+        elif thread_id is None:
+            # 创建并执行工作流
+            app = create_workflow()
+            logger.info("工作流创建完成，正在执行...\n%s", SEP)
+            
+            result = await _stream_workflow(app, initial_state, on_progress=on_progress)
+            # 有Agent失败的结果不缓存，下次调用重新执行
+            if not result.get("errors"):
+                _result_cache_put(cache_key, result)
+        else:
+            os.makedirs(os.path.dirname(CHECKPOINT_DB), exist_ok=True)
+            async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as checkpointer:
+                app = create_workflow(checkpointer)
+                config = {"configurable": {"thread_id": thread_id}}
+                logger.info("工作流创建完成 (检查点线程: %s)", thread_id)
+                
+                snapshot = await app.aget_state(config)
+                if snapshot.values and not snapshot.next and snapshot.values.get("errors"):
+                    # 与进程内结果缓存一致，有Agent失败的结果不复用，清除该线程后重新执行
+                    logger.info("检查点中的分析结果包含 %d 个错误，重新执行", len(snapshot.values["errors"]))
+                    await checkpointer.adelete_thread(thread_id)
+                    snapshot = await app.aget_state(config)
+                
+                if snapshot.values and not snapshot.next:
+                    logger.info("检查点中已有完整的分析结果，跳过执行")
+                    result = snapshot.values
+                else:
+                    # 有待执行节点时传入None，从最后完成的节点继续
+                    if snapshot.next:
+                        logger.info("从检查点恢复，待执行节点: %s", ", ".join(snapshot.next))
+                    logger.info("正在执行工作流...\n%s", SEP)
+                    result = await _stream_workflow(
+                        app, initial_state if not snapshot.next else None, config, on_progress
+                    )
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%s\n【工作流执行完成】\n%s\n结束时间: %s\n总耗时: %.1f 秒\n%s",
+            SEP, SEP, time.strftime('%Y-%m-%d %H:%M:%S'), time.monotonic() - started, SEP
+        )
     
-    if keyword is None:
-        # 尝试从symbol映射中文名
-        from tools.futures_analyzer import FuturesAnalyzer
-        analyzer = FuturesAnalyzer(symbol)
-        keyword = analyzer.chinese_name
-        logger.info(f"自动映射中文名: {keyword}")
-    else:
-        logger.info(f"搜索关键词: {keyword}")
+    return result
+
+
+async def analyze_futures_stream(symbol: str, keyword: str = None) -> AsyncIterator[str]:
+    """
+    流式分析期货品种，逐段产出汇总Agent生成的报告文本
+    
+    前面各阶段照常执行，进入汇总节点后每收到一段模型输出就立即产出，
+    调用方无需等待整份报告生成完毕即可开始展示
     
-    logger.info("="*80)
+    参数:
+        symbol (str): 期货品种代码，如 "ss" (不锈钢)
+        keyword (str): 搜索关键词，如 "不锈钢"，默认为symbol
     
-    # 创建工作流
-    logger.debug("正在创建工作流...")
+    返回:
+        AsyncIterator[str]: 汇总报告的文本片段
+    """
     app = create_workflow()
-    logger.info("工作流创建完成")
-    
-    # 执行工作流
-    logger.info("正在执行工作流...")
-    logger.info("="*80)
-    
-    result = app.invoke({
-        "symbol": symbol,
-        "keyword": keyword,
-        "news_result": [],
-        "sentiment_result": [],
-        "fundamental_result": [],
-        "bullish_result": [],
-        "bearish_result": [],
-        "errors": [],
-        "first_phase_ready": False,
-        "second_phase_ready": False,
-        "final_report": "",
-        "report_path": ""
-    })
-    
-    logger.info("="*80)
-    logger.info("【工作流执行完成】")
-    logger.info("="*80)
-    logger.info(f"结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info("="*80)
+    async for event in app.astream_events(_initial_state(symbol, keyword), version="v2"):
+        if event["event"] != "on_chat_model_stream":
+            continue
+        # 只转发汇总节点内模型的输出，命名空间形如 "summary_agent:<id>|agent:<id>"
+        if not event["metadata"].get("langgraph_checkpoint_ns", "").startswith("summary_agent:"):
+            continue
+        text = event["data"]["chunk"].content
+        if text:
+            yield text
+
+
+async def analyze_futures_batch(
+    symbols: List[Tuple[str, Optional[str]]],
+    max_concurrency: int = 4,
+    return_full: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    异步批量分析多个期货品种
     
-    return result
+    通过 abatch 在同一事件循环中并发执行多个工作流，各品种的LLM请求互相重叠，
+    每个品种的 PDF 只合并该品种本次保存的报告文件
+    
+    参数:
+        symbols (List[Tuple[str, Optional[str]]]): (品种代码, 搜索关键词) 列表，关键词为None时使用品种中文名
+        max_concurrency (int): 同时执行的工作流数量上限，避免触发 DeepSeek 与搜索接口的限流
+        return_full (bool): 为True时返回包含各Agent输出的完整状态
+    
+    返回:
+        List[Dict]: 与输入顺序一致的分析结果，默认与 analyze_futures 相同只包含
+            final_report、report_path 和 errors
+    """
+    app = create_workflow()
+    states = [_initial_state(symbol, keyword) for symbol, keyword in symbols]
+    results = await app.abatch(states, config={"max_concurrency": max_concurrency})
+    if return_full:
+        return results
+    return [_slim_result(result) for result in results]
+
+
+def analyze_futures(
+    symbol: str,
+    keyword: str = None,
+    thread_id: str = None,
+    on_progress: Callable[[str, Any], None] = None,
+    use_cache: bool = True,
+    return_full: bool = False
+) -> Dict[str, Any]:
+    """
+    分析期货品种的便捷函数
+    
+    同步封装 analyze_futures_async，不能在已运行的事件循环中调用
+    
+    参数:
+        symbol (str): 期货品种代码，如 "ss" (不锈钢)
+        keyword (str): 搜索关键词，如 "不锈钢"，默认为symbol
+        thread_id (str): 检查点线程ID，默认不使用检查点
+        on_progress (Callable): 可选回调，每个节点完成时以 (节点名, 状态更新) 调用，
+            复用缓存结果时以 ("result_cache", 结果) 调用一次
+        use_cache (bool): 为False时不复用进程内的分析结果，重新获取当天行情数据，并忽略已缓存的LLM回复
+        return_full (bool): 为True时返回包含各Agent输出的完整状态
+    
+    返回:
+        Dict: 默认只包含 final_report、report_path 和 errors，避免跨进程传递时序列化各Agent的中间输出
+    """
+    result = asyncio.run(analyze_futures_async(symbol, keyword, thread_id, on_progress, use_cache))
+    return result if return_full else _slim_result(result)
 
 
 # ============== 主程序 ==============
@@ -1038,8 +1171,20 @@ if __name__ == "__main__":
     
     logger.info("开始测试期货分析工作流...")
     
-    # 分析不锈钢期货
-    result = analyze_futures("ss", "不锈钢")
+    def log_progress(node: str, update: Any):
+        """每个节点完成时输出进度"""
+        logger.info("节点完成: %s (更新字段: %s)", node, ", ".join(update or {}) or "无")
+    
+    # 分析不锈钢期货，边执行边输出各节点进度 (安装了 uvloop 时使用其事件循环)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    if uvloop is not None:
+        result = _slim_result(uvloop.run(analyze_futures_async("ss", "不锈钢", on_progress=log_progress)))
+    else:
+        result = analyze_futures("ss", "不锈钢", on_progress=log_progress)
     
     logger.info("#"*80)
     logger.info("# 最终结果预览")
@@ -1048,9 +1193,9 @@ if __name__ == "__main__":
     if result.get("final_report"):
         logger.info(f"最终报告已生成，长度: {len(result['final_report'])} 字符")
         logger.info("报告内容:")
-        logger.info("-"*80)
+        logger.info(DASH)
         logger.info(result["final_report"])
-        logger.info("-"*80)
+        logger.info(DASH)
     else:
         logger.warning("未生成最终报告")
     